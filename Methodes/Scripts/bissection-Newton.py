@@ -74,7 +74,7 @@ d = computeDigits(xexact, xs, 10)
 print(u"Correct decimal digits=", d)
 print(u"Iterations=", len(history))
 print("Historique de la bissection")
-print(history)
+print(history.tolist())
 #
 # 3.2 Faire un graphique
 print(u"")
@@ -109,7 +109,7 @@ d = computeDigits(xexact, xs, 10)
 print(u"Correct decimal digits=", d)
 print(u"Iterations=", len(history))
 print("Historique de Newton")
-print(history)
+print(history.tolist())
 #
 # 4.2 Faire un graphique
 print(u"")
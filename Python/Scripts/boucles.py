@@ -9,6 +9,8 @@ Références
 Michaël Baudin, "Introduction aux méthodes numériques". 
 Dunod. Collection Sciences Sup. (2023)
 """
+import numpy as np
+
 #
 # Boucles
 print(u"Boucles")
@@ -38,3 +40,8 @@ for n in range(1, nMax):
     a.append(1.0 / n)
 
 print(a)
+#
+# Version vectorisée avec NumPy : plus rapide si nMax est grand
+# (à partir de quelques milliers), plus lente si nMax est petit.
+a = (1.0 / np.arange(1, nMax, dtype=np.float64)).tolist()
+print(a)
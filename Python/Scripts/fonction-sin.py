@@ -17,7 +17,8 @@ matplotlibpreferences.load_preferences()
 
 x = np.linspace(0.0, 2.0 * np.pi)
 y = np.sin(x)
-pl.figure(figsize=(2.0, 1.0))
+# Réutilise la figure nommée si elle existe déjà (exécutions successives)
+pl.figure("fonction-sin", figsize=(2.0, 1.0), clear=True)
 pl.title(u"La fonction sin")
 pl.plot(x, y, "-")
 pl.xlabel(u"$x$")
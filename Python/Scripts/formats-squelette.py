@@ -1,4 +1,4 @@
 a = 1234.56789
 n = 9876
-print(TODO % a)
-print(TODO % n)
+print(f"a = {a:TODO}")
+print(f"n = {n:TODO}")
@@ -14,8 +14,8 @@ Dunod. Collection Sciences Sup. (2023)
 print(u"Formats")
 a = 1234.56789
 n = 9876
-print(u"n = %6d" % n)  # Pad with spaces
-print(u"a = %f" % a)
-print(u"a = %e" % a)
-print(u"a = %6.2f" % a)
-print(u"a = %6.2e" % a)
+print(f"n = {n:6d}")  # Pad with spaces
+print(f"a = {a:f}")
+print(f"a = {a:e}")
+print(f"a = {a:6.2f}")
+print(f"a = {a:6.2e}")
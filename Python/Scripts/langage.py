@@ -10,6 +10,8 @@ Références
 Michaël Baudin, "Introduction aux méthodes numériques". 
 Dunod. Collection Sciences Sup. (2023)
 """
+import numpy as np
+
 #
 # 1. Variables
 print(u"1. Variables")
@@ -101,6 +103,11 @@ a = []  # Create empty list
 for n in range(1, nMax):
     a.append(1.0 / n)
 
+print(a)
+#
+# Version vectorisée avec NumPy : plus rapide si nMax est grand
+# (à partir de quelques milliers), plus lente si nMax est petit.
+a = (1.0 / np.arange(1, nMax, dtype=np.float64)).tolist()
 print(a)
 #
 # 7. Fonctions maths communes
@@ -121,8 +128,8 @@ print(u"8. Formats")
 #        dont d apres la virgule.
 a = 1234.56789
 n = 9876
-print(u"n = %6d" % n)  # Pad with spaces
-print(u"a = %f" % a)
-print(u"a = %e" % a)
-print(u"a = %6.2f" % a)
-print(u"a = %6.2e" % a)
+print(f"n = {n:6d}")  # Pad with spaces
+print(f"a = {a:f}")
+print(f"a = {a:e}")
+print(f"a = {a:6.2f}")
+print(f"a = {a:6.2e}")
@@ -8,10 +8,19 @@ Michaël Baudin, "Introduction aux méthodes numériques".
 Dunod. Collection Sciences Sup. (2023)
 """
 
+import math
+import platform
 import numpy as np
 import pylab as pl
+from matplotlib.collections import LineCollection
 from scipy.special import erf
 
+# -log(2**(-53)), the number of natural digits of a double
+_LOG_EPS_53 = 53.0 * math.log(2.0)
+
+# NumPy calls are slow on PyPy: some functions use pure Python loops instead
+_IS_PYPY = platform.python_implementation() == "PyPy"
+
 
 def computeDigits(expected, computed, basis=2.0):
     """
@@ -44,14 +53,13 @@ def computeDigits(expected, computed, basis=2.0):
     >>> basis = 10.0
     >>> d = computeDigits(exact, computed, basis)
     """
+    inv_logb = 1.0 / math.log(basis)
     relerr = relativeError(expected, computed)
-    dmin = 0
-    dmax = -np.log(2 ** (-53)) / np.log(basis)
     if relerr == 0.0:
-        d = dmax
+        d = _LOG_EPS_53 * inv_logb
     else:
-        d = -np.log(relerr) / np.log(basis)
-        d = max(dmin, d)
+        d = -math.log(relerr) * inv_logb
+        d = max(0.0, d)
     return d
 
 
@@ -76,12 +84,13 @@ def relativeError(expected, computed):
     >>> computed = 1.0
     >>> relerr = relativeError(exact, computed)
     """
-    if (expected == 0.0) & (computed == 0):
-        e = 0
-    elif expected == 0.0:
-        e = float("inf")
+    if expected == 0.0:
+        if computed == 0.0:
+            e = 0.0
+        else:
+            e = math.inf
     else:
-        e = abs(computed - expected) / abs(expected)
+        e = math.fabs(computed - expected) / math.fabs(expected)
     return e
 
 
@@ -135,10 +144,22 @@ def computeDigits2Darray(expected, computed, basis=2.0):
     if computed.shape[1] != ncols:
         print(u"Error ! Number of columns do not match")
         return None
-    digits = np.zeros((nrows, ncols))
-    for i in range(nrows):
-        for j in range(ncols):
-            digits[i, j] = computeDigits(expected[i, j], computed[i, j], 10)
+    # Vectorized form of computeDigits(expected[i, j], computed[i, j], 10),
+    # computed in place to avoid temporary arrays.
+    relerr = np.subtract(computed, expected, dtype=np.float64)
+    np.abs(relerr, out=relerr)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(relerr, np.abs(expected), out=relerr)
+    relerr[(expected == 0.0) & (computed == 0.0)] = 0.0
+    inv_logb = 1.0 / math.log(10.0)
+    dmax = _LOG_EPS_53 * inv_logb
+    digits = relerr
+    iszero = relerr == 0.0
+    with np.errstate(divide="ignore"):
+        np.log(digits, out=digits)
+    np.multiply(digits, -inv_logb, out=digits)
+    np.fmax(digits, 0.0, out=digits)
+    digits[iszero] = dmax
     return digits
 
 
@@ -172,9 +193,41 @@ def fCond(f, x, dx=1.0e-8):
     >>> x = 2.0
     >>> c = fCond(np.log, x)
     """
+    c = float(fCondArray(f, np.float64(x), dx))
+    return c
+
+
+def fCondArray(f, x, dx=1.0e-8):
+    """
+    Compute the condition number of f at several points.
+
+    This is the vectorized version of fCond: the function f
+    is called once on the array x and once on x + dx.
+
+    Parameters
+    ----------
+    f : a function
+        The vectorized function y=f(x) which condition number
+        is to be computed.
+    x : np.array
+        The points where the condition number should be computed.
+    dx : float
+        The step used for the finite difference
+
+    Returns
+    -------
+    c : np.array
+        The condition numbers of f(x)
+
+    Examples
+    --------
+    >>> x = np.linspace(2.0, 10.0, 100)
+    >>> c = fCondArray(np.log, x)
+    """
+    x = np.asarray(x, dtype=np.float64)
     y = f(x)
     yh = f(x + dx)
-    c = (abs(yh - y) / abs(y)) / (abs(dx) / x)
+    c = np.abs((yh - y) * x) / (np.abs(y) * abs(dx))
     return c
 
 
@@ -319,7 +372,13 @@ def erfCond(x):
 
 
 def computefloats(
-    p=3, emin=-2, emax=3, logscale=False, allpositive=True, withdenormals=False
+    p=3,
+    emin=-2,
+    emax=3,
+    logscale=False,
+    allpositive=True,
+    withdenormals=False,
+    as_list=False,
 ):
     """
     Computes all floating point numbers in a system.
@@ -344,11 +403,14 @@ def computefloats(
     withdenormals : bool
         Set to True to compute subnormal numbers
         (default=False)
+    as_list : bool
+        Set to True to return a list of floats
+        (default=False)
 
     Returns
     -------
-    allfloats: list of floats
-        The list of required floating point numbers.
+    allfloats: np.array
+        The sorted array of required floating point numbers.
 
     Examples
     --------
@@ -356,30 +418,101 @@ def computefloats(
     >>> allfloats = computefloats(logscale=True)
     >>> allfloats = computefloats(allpositive=False)
     >>> allfloats = computefloats(withdenormals=True)
+    >>> allfloats = computefloats(as_list=True)
     """
-    if (not allpositive) & logscale:
+    if not allpositive and logscale:
         print(u"Error : Cannot enable both logscale" + "and compute negative numbers !")
         return
     # 1. Compute
-    allfloats = []
+    if _IS_PYPY:
+        # On PyPy, pure Python loops are compiled by the JIT
+        allfloats = []
+        _fill_floats(
+            p, emin, emax, logscale, allpositive, withdenormals, allfloats.append
+        )
+        allfloats = np.array(allfloats)
+    else:
+        # The array is allocated once: normals, then denormals, then negatives
+        nbmantissas = 1 << (p - 1)
+        nbexponents = emax - emin + 1
+        nbnormals = nbexponents * nbmantissas
+        nbpositive = nbnormals
+        if withdenormals:
+            nbpositive += nbmantissas
+        nbfloats = nbpositive
+        if not allpositive:
+            nbfloats *= 2
+        allfloats = np.empty(nbfloats)
+        # Each row of the grid is M*2**(e-p+1) for a fixed exponent e
+        mantissas = np.arange(nbmantissas, 2 * nbmantissas, dtype=np.float64)
+        exponents = np.arange(emin, emax + 1)
+        normals = allfloats[:nbnormals].reshape(nbexponents, nbmantissas)
+        np.ldexp(mantissas[None, :], exponents[:, None] - p + 1, out=normals)
+        if withdenormals:
+            mantissas = np.arange(0, nbmantissas, dtype=np.float64)
+            np.ldexp(mantissas, emin - p + 1, out=allfloats[nbnormals:nbpositive])
+        if logscale:
+            np.log2(allfloats, out=allfloats)
+        if not allpositive:
+            np.negative(allfloats[:nbpositive], out=allfloats[nbpositive:])
+    allfloats.sort()
+    if as_list:
+        allfloats = allfloats.tolist()
+    return allfloats
+
+
+def _fill_floats(p, emin, emax, logscale, allpositive, withdenormals, out_append):
+    """
+    Computes all floating point numbers in a system with Python loops.
+
+    This is the pure Python version of computefloats, based
+    on the math module only.
+    It is used on PyPy, where the tracing JIT compiles these loops,
+    while the NumPy version is faster on CPython.
+    The numbers are not sorted.
+
+    Parameters
+    ----------
+    p : int
+        The precision.
+    emin : int
+        The minimum exponent.
+    emax : int
+        The maximum exponent.
+    logscale : bool
+        Set to True to enable log2-scale.
+    allpositive : bool
+        Set to False to compute negative numbers.
+    withdenormals : bool
+        Set to True to compute subnormal numbers.
+    out_append : a function
+        The function out_append(x) called for each number x.
+
+    Examples
+    --------
+    >>> allfloats = []
+    >>> _fill_floats(3, -2, 3, False, True, False, allfloats.append)
+    """
     for e in range(emin, emax + 1):
-        for M in range(2 ** (p - 1), 2 ** p):
-            x = M * 2 ** (e - p + 1)
+        for M in range(1 << (p - 1), 1 << p):
+            x = math.ldexp(M, e - p + 1)
             if logscale:
-                x = np.log2(x)
-            allfloats.append(x)
+                x = math.log2(x)
+            out_append(x)
             if not allpositive:
-                allfloats.append(-x)
+                out_append(-x)
     if withdenormals:
-        for M in range(0, 2 ** (p - 1)):
-            x = M * 2 ** (emin - p + 1)
+        for M in range(0, 1 << (p - 1)):
+            x = math.ldexp(M, emin - p + 1)
             if logscale:
-                x = np.log2(x)
-            allfloats.append(x)
+                if M == 0:
+                    x = -math.inf
+                else:
+                    x = math.log2(x)
+            out_append(x)
             if not allpositive:
-                allfloats.append(-x)
-    allfloats = sorted(allfloats)
-    return allfloats
+                out_append(-x)
+    return
 
 
 def floatgui(
@@ -411,8 +544,8 @@ def floatgui(
 
     Returns
     -------
-    allfloats: list of floats
-        The list of required floating point numbers.
+    allfloats: np.array
+        The sorted array of required floating point numbers.
 
     Examples
     --------
@@ -421,7 +554,7 @@ def floatgui(
     >>> allfloats = floatgui(allpositive=False)
     >>> allfloats = floatgui(withdenormals=True)
     """
-    if (not allpositive) & logscale:
+    if not allpositive and logscale:
         print(u"Error : Cannot enable both logscale" + "and compute negative numbers !")
         return
     # 1. Compute
@@ -434,10 +567,18 @@ def floatgui(
         pl.xlabel(u"x")
     stitle = "Système flottant, p=%d, emin=%d, emax=%d" % (p, emin, emax)
     pl.title(stitle)
-    for x in allfloats:
-        pl.plot([x, x], [-0.1, 0.1], "-", color="tab:blue", linewidth=0.5)
-    xmin = min(allfloats)
-    xmax = max(allfloats)
+    # One vertical segment [(x, -0.1), (x, 0.1)] for each float
+    segments = np.empty((len(allfloats), 2, 2))
+    segments[:, 0, 0] = allfloats
+    segments[:, 1, 0] = allfloats
+    segments[:, 0, 1] = -0.1
+    segments[:, 1, 1] = 0.1
+    pl.gca().add_collection(
+        LineCollection(segments, colors="tab:blue", linewidths=0.5)
+    )
+    # The floats are sorted
+    xmin = allfloats[0]
+    xmax = allfloats[-1]
     delta_x = 1.0
     pl.axis([xmin - delta_x, xmax + delta_x, -1, 1])
     frame1 = pl.gca()
@@ -510,6 +651,16 @@ if __name__ == "__main__":
     print(u"cond_exact=", cond_exact)
     np.testing.assert_almost_equal(cond_approche, cond_exact, decimal=4)
 
+    # Vérification de fCondArray
+    x = np.linspace(2.0, 10.0, 5)
+    cond_approche = fCondArray(np.log, x)
+    cond_exact = logCond(x)
+    print(u"Verification fCondArray")
+    print(u"x=", x)
+    print(u"cond_approche=", cond_approche)
+    print(u"cond_exact=", cond_exact)
+    np.testing.assert_almost_equal(cond_approche, cond_exact, decimal=4)
+
     # Verif computeDigits2Darray
     expected = np.array([[1.0], [2.0], [3.0]])
     computed = np.array([[1.01], [2.01], [3.01]])
@@ -9,9 +9,16 @@ Dunod. Collection Sciences Sup. (2023)
 """
 
 import sys
-import pylab as pl
+import math
 import numpy as np
-from interp import polynomial_interpolation
+
+# The size of the history of the solvers: at most 101 iterations
+# plus the initial points
+_HISTORY_SIZE = 104
+
+# The relative tolerance under which two function values are considered
+# equal in the inverse quadratic interpolation
+_IQI_RELTOL = 1.0e-14
 
 
 def _compute_and_plot(x, f, *args):
@@ -35,12 +42,45 @@ def _compute_and_plot(x, f, *args):
     y : float
         The value of f(x).
     """
+    import pylab as pl
+
     pl.plot(x, 0.0, "b|")
     print(u"x=%.17e" % (x))
     y = f(x, *args)
     return y
 
 
+def _function_values(f, x, *args):
+    """
+    Evaluate the function f on an array of points.
+
+    The function is evaluated on the whole array if it supports arrays,
+    otherwise one point at a time.
+
+    Parameters
+    ----------
+    f : function
+        The function.
+    x : np.array(N)
+        The points.
+    *args : list
+        The extra input arguments for f.
+
+    Returns
+    -------
+    y : np.array(N)
+        The values of f at x.
+    """
+    try:
+        y = np.asarray(f(x, *args), dtype=float)
+    except Exception:
+        y = None
+    if y is None or y.shape != x.shape:
+        f_vectorized = np.vectorize(lambda xi: f(xi, *args), otypes=[np.float64])
+        y = f_vectorized(x)
+    return y
+
+
 def _function_plot(f, a, b, N=100, *args):
     """
     Plot the function f on interval [a, b].
@@ -63,10 +103,10 @@ def _function_plot(f, a, b, N=100, *args):
     None.
 
     """
+    import pylab as pl
+
     x = np.linspace(min([a, b]), max([a, b]), N)
-    y = np.zeros((N, 1))
-    for i in range(N):
-        y[i] = f(x[i], *args)
+    y = _function_values(f, x, *args)
     pl.figure()
     pl.plot(x, y, "-")
     pl.xlabel(u"x")
@@ -74,6 +114,65 @@ def _function_plot(f, a, b, N=100, *args):
     return None
 
 
+def _bisection_default(f, a, b):
+    """
+    Solves f(x)=0 by bisection, with the default options.
+
+    This is bisection specialized for the default tolerances,
+    without messages and without extra arguments for f.
+    It produces the same iterates.
+
+    Parameters
+    ----------
+    f : function
+        The function involved in the non linear equation.
+    a : float
+        The left boundary
+    b : float
+        The right boundary
+
+    Returns
+    -------
+    c : float
+        The approximate root
+    history : np.array
+        The approximate roots computed
+        during the iterations of the algorithm.
+    """
+    reltolx = 2.0 * sys.float_info.epsilon
+    history = np.empty(_HISTORY_SIZE)
+    history[0] = a
+    fa = f(a)
+    if fa == 0.0:
+        return a, history[:1]
+    history[1] = b
+    fb = f(b)
+    if fb == 0.0:
+        return b, history[:2]
+    sa = fa > 0.0
+    if sa == (fb > 0.0):
+        raise ValueError(u"The interval (a,b) does not bracket a root")
+    n = 2
+    k = 0
+    tol = reltolx * math.fabs(b)
+    while math.fabs(b - a) > tol:
+        c = 0.5 * a + 0.5 * b
+        fc = f(c)
+        history[n] = c
+        n = n + 1
+        if fc == 0:
+            break
+        if sa != (fc > 0.0):
+            b = c
+            tol = reltolx * math.fabs(b)
+        else:
+            a = c
+        k = k + 1
+        if k > 100:
+            raise ValueError(u"Warning : maximum number of iterations reached!")
+    return c, history[:n]
+
+
 def bisection(f, a, b, reltolx=None, abstolx=0.0, verbose=False, *args):
     """
     Solves f(x)=0 by bisection.
@@ -114,7 +213,7 @@ def bisection(f, a, b, reltolx=None, abstolx=0.0, verbose=False, *args):
 
     but rather:
 
-        if np.sign(fa) != np.sign(fb)
+        if (fa > 0.0) != (fb > 0.0)
 
     Parameters
     ----------
@@ -139,7 +238,7 @@ def bisection(f, a, b, reltolx=None, abstolx=0.0, verbose=False, *args):
     -------
     c : float
         The approximate root.
-    history : list of floats
+    history : np.array
         The approximate roots computed
         of the iterations of the algorithm
 
@@ -156,41 +255,58 @@ def bisection(f, a, b, reltolx=None, abstolx=0.0, verbose=False, *args):
     Malcolm, Michael A., Cleve B. Moler, and George Elmer Forsythe.
     Computer methods for mathematical computations. Prentice-Hall, 1977.
     """
+    if reltolx is None and abstolx == 0.0 and not verbose and not args:
+        return _bisection_default(f, a, b)
     if reltolx == None:
         reltolx = 2.0 * sys.float_info.epsilon
-    history = []
-    history.append(a)
-    fa = f(a, *args)
+    # Bind the extra arguments once, outside of the loop
+    if args:
+        g = lambda x: f(x, *args)
+    else:
+        g = f
+    history = np.empty(_HISTORY_SIZE)
+    n = 0
+    history[n] = a
+    n = n + 1
+    fa = g(a)
     if fa == 0.0:
-        return a, history
-    history.append(b)
-    fb = f(b, *args)
+        return a, history[:n]
+    history[n] = b
+    n = n + 1
+    fb = g(b)
     if fb == 0.0:
-        return b, history
+        return b, history[:n]
     if verbose:
         print("a=%.3e, fa=%.3e" % (a, fa))
         print("b=%.3e, fb=%.3e" % (b, fb))
-    if np.sign(fa) == np.sign(fb):
+    if (fa > 0.0) == (fb > 0.0):
         raise ValueError(u"The interval (a,b) does not bracket a root")
     k = 0
-    while abs(b - a) > reltolx * abs(b) + abstolx:
-        c = (a + b) / 2.0
-        fc = f(c, *args)
-        history.append(c)
+    sa = fa > 0.0
+    # The tolerance only changes when b is updated
+    tol = reltolx * math.fabs(b) + abstolx
+    while math.fabs(b - a) > tol:
+        c = 0.5 * a + 0.5 * b
+        fc = g(c)
+        history[n] = c
+        n = n + 1
         if fc == 0:
             break
-        elif np.sign(fa) != np.sign(fc):
+        sc = fc > 0.0
+        if sa != sc:
             b = c
             fb = fc
+            tol = reltolx * math.fabs(b) + abstolx
         else:
             a = c
             fa = fc
+            sa = sc
         if verbose:
             print("In [%.3e, %.3e] @ [%.3e, %.3e]" % (a, b, fa, fb))
         k = k + 1
         if k > 100:
             raise ValueError(u"Warning : maximum number of iterations reached!")
-    return c, history
+    return c, history[:n]
 
 
 def bisectiongui(f, a, b, reltolx=None, abstolx=0.0, *args):
@@ -222,7 +338,7 @@ def bisectiongui(f, a, b, reltolx=None, abstolx=0.0, *args):
     -------
     c : float
         The approximate root.
-    history : list of floats
+    history : np.array
         The approximate roots computed
         of the iterations of the algorithm
 
@@ -241,6 +357,101 @@ def bisectiongui(f, a, b, reltolx=None, abstolx=0.0, *args):
     return c, history
 
 
+def bisection_vec(f, a, b, reltolx=None, abstolx=0.0, *args):
+    """
+    Solves several equations f(x)=0 by bisection at the same time.
+
+    This is the vectorized version of bisection.
+    Each component i of the arrays a and b defines an
+    independent equation, whose root is bracketed in (a[i], b[i]).
+    All the equations are solved together, so that the
+    function f is called once per iteration on the whole array.
+
+    The function f must be vectorized, i.e. have the calling sequence
+
+    y=f(x)
+
+    where x and y are arrays with the same shape as a and b.
+    The function is evaluated at all the components, including
+    the ones which have already converged.
+
+    If extra-arguments are provided in the args input
+    argument, the function f is supposed to have the calling
+    sequence
+
+        y=f(x,*args)
+
+    Parameters
+    ----------
+    f : function
+        The vectorized function involved in the non linear equations.
+    a : np.array
+        The left boundaries
+    b : np.array
+        The right boundaries
+    reltolx : float
+        The relative tolerance on x.
+        We must have reltolx > 0.
+        Default is twice the machine epsilon.
+    abstolx : float
+        The absolute tolerance on x.
+        We must have abstolx > 0.
+        Default is zero.
+    *args : list
+        The extra input arguments for f.
+
+    Returns
+    -------
+    c : np.array
+        The approximate roots.
+    history : list of np.array
+        The approximate roots computed
+        during the iterations of the algorithm
+
+    Examples
+    --------
+    >>> def myFunction(x, p):
+    >>>     y = x ** 2 - p
+    >>>     return y
+    >>>
+    >>> p = np.array([2.0, 3.0, 5.0])
+    >>> a = np.ones(3)
+    >>> b = np.full(3, 3.0)
+    >>> xs, history = bisection_vec(myFunction, a, b, None, 0.0, p)
+    """
+    if reltolx is None:
+        reltolx = 2.0 * sys.float_info.epsilon
+    a = np.array(a, dtype=float)
+    b = np.array(b, dtype=float)
+    fa = f(a, *args)
+    fb = f(b, *args)
+    if np.any((np.sign(fa) == np.sign(fb)) & (fa != 0.0) & (fb != 0.0)):
+        raise ValueError(u"One interval (a,b) does not bracket a root")
+    # An equation is solved if f is zero at one of its end points
+    c = np.where(fa == 0.0, a, b)
+    active = (fa != 0.0) & (fb != 0.0)
+    history = [c.copy()]
+    k = 0
+    while True:
+        active &= np.abs(b - a) > reltolx * np.abs(b) + abstolx
+        if not np.any(active):
+            break
+        c = np.where(active, 0.5 * a + 0.5 * b, c)
+        fc = f(c, *args)
+        history.append(c.copy())
+        active &= fc != 0.0
+        update_b = active & (np.sign(fa) != np.sign(fc))
+        update_a = active & ~update_b
+        b = np.where(update_b, c, b)
+        fb = np.where(update_b, fc, fb)
+        a = np.where(update_a, c, a)
+        fa = np.where(update_a, fc, fa)
+        k = k + 1
+        if k > 100:
+            raise ValueError(u"Warning : maximum number of iterations reached!")
+    return c, history
+
+
 def newton(f, x0, fprime, reltolx=None, abstolx=0.0, verbose=False, *args):
     """
     Solves f(x)=0 by Newton-Raphson.
@@ -299,7 +510,7 @@ def newton(f, x0, fprime, reltolx=None, abstolx=0.0, verbose=False, *args):
     -------
     x : float
         The approximate root.
-    history : list of floats
+    history : np.array
         The approximate root
         computed during the iterations of the algorithm
 
@@ -317,24 +528,38 @@ def newton(f, x0, fprime, reltolx=None, abstolx=0.0, verbose=False, *args):
     """
     if reltolx == None:
         reltolx = 2.0 * sys.float_info.epsilon
-    xprev = float("inf")
+    # Bind the extra arguments once, outside of the loop
+    if args:
+        g = lambda x: f(x, *args)
+        gprime = lambda x: fprime(x, *args)
+    else:
+        g = f
+        gprime = fprime
     x = x0
-    history = [x0]
+    history = np.empty(_HISTORY_SIZE)
+    history[0] = x0
+    n = 1
     k = 0
-    while abs(x - xprev) > reltolx * abs(x) + abstolx:
+    # The stopping test is at the end of the loop: the first iteration
+    # has no previous value to compare with
+    while True:
         xprev = x
-        fx = f(x, *args)
+        fx = g(x)
         if verbose:
             print("x=%.3e, fx=%.3e" % (x, fx))
         if fx == 0.0:
             break
-        s = fprime(x, *args)
+        s = gprime(x)
         x = x - fx / s
-        history.append(x)
+        history[n] = x
+        n = n + 1
         k = k + 1
         if k > 100:
             raise ValueError(u"Maximum number of iterations reached!")
-    return x, history
+        # A nan step also stops the iterations, as in the previous test
+        if not math.fabs(x - xprev) > reltolx * math.fabs(x) + abstolx:
+            break
+    return x, history[:n]
 
 
 def newtongui(f, x0, fprime, reltolx=None, abstolx=0.0, *args):
@@ -367,7 +592,7 @@ def newtongui(f, x0, fprime, reltolx=None, abstolx=0.0, *args):
     -------
     x : float
         The approximate root.
-    history : list of floats
+    history : np.array
         The approximate root
         computed during the iterations of the algorithm
 
@@ -390,6 +615,100 @@ def newtongui(f, x0, fprime, reltolx=None, abstolx=0.0, *args):
     return c, history
 
 
+def newton_vec(f, x0, fprime, reltolx=None, abstolx=0.0, *args):
+    """
+    Solves several equations f(x)=0 by Newton-Raphson at the same time.
+
+    This is the vectorized version of newton.
+    Each component i of the array x0 is the initial guess
+    of an independent equation.
+    All the equations are solved together, so that the
+    functions f and fprime are called once per iteration
+    on the whole array.
+    The iterations stop for the component i when
+    abs(x[i] - xprev[i]) <= reltolx * abs(x[i]) + abstolx
+    or when f(x)[i] is zero.
+
+    The functions f and fprime must be vectorized, i.e. have the
+    calling sequences
+
+    y=f(x)
+
+    y=fprime(x)
+
+    where x and y are arrays with the same shape as x0.
+
+    If extra-arguments are provided in the args input
+    argument, the functions are supposed to have the calling
+    sequences
+
+        y=f(x,*args)
+
+        y=fprime(x,*args)
+
+    Parameters
+    ----------
+    f : function
+        The vectorized function involved in the non linear equations.
+    x0 : np.array
+        The initial guesses
+    fprime : function
+        The vectorized first derivative of f
+    reltolx : float
+        The relative tolerance on x.
+        Default is twice the machine epsilon.
+    abstolx : float
+        The absolute tolerance on x.
+        We must have abstolx > 0.
+        Default is zero.
+    *args : list
+        The extra input arguments for f and fprime.
+
+    Returns
+    -------
+    x : np.array
+        The approximate roots.
+    history : list of np.array
+        The approximate roots
+        computed during the iterations of the algorithm
+
+    Examples
+    --------
+    >>> def myFunction(x, p):
+    >>>     y = x ** 2 - p
+    >>>     return y
+    >>>
+    >>> def myFunctionPrime(x, p):
+    >>>     y = 2 * x
+    >>>     return y
+    >>>
+    >>> p = np.array([2.0, 3.0, 5.0])
+    >>> x0 = np.ones(3)
+    >>> xs, history = newton_vec(myFunction, x0, myFunctionPrime, None, 0.0, p)
+    """
+    if reltolx is None:
+        reltolx = 2.0 * sys.float_info.epsilon
+    x = np.array(x0, dtype=float)
+    xprev = np.full_like(x, np.inf)
+    active = np.ones(x.shape, dtype=bool)
+    history = [x.copy()]
+    k = 0
+    while True:
+        active &= np.abs(x - xprev) > reltolx * np.abs(x) + abstolx
+        if not np.any(active):
+            break
+        xprev = x.copy()
+        fx = f(x, *args)
+        active &= fx != 0.0
+        s = fprime(x, *args)
+        x[active] = x[active] - fx[active] / s[active]
+        history.append(x.copy())
+        k = k + 1
+        if k > 100:
+            raise ValueError(u"Maximum number of iterations reached!")
+    return x, history
+
+
 def _newton_fplot(x, f, fprime, *args):
     """
     Plots a blue bar at abscissa x, and computes y=f(x).
@@ -505,7 +824,7 @@ def secant(f, a, b, reltolx=None, abstolx=0.0, verbose=False, *args):
     -------
     c : float
         The approximate root
-    history : list of floats
+    history : np.array
         The approximate roots computed
         during the iterations of the algorithm.
 
@@ -519,30 +838,39 @@ def secant(f, a, b, reltolx=None, abstolx=0.0, verbose=False, *args):
     """
     if reltolx == None:
         reltolx = 2.0 * sys.float_info.epsilon
-    history = []
-    history.append(a)
-    fa = f(a, *args)
+    # Bind the extra arguments once, outside of the loop
+    if args:
+        g = lambda x: f(x, *args)
+    else:
+        g = f
+    history = np.empty(_HISTORY_SIZE)
+    n = 0
+    history[n] = a
+    n = n + 1
+    fa = g(a)
     if fa == 0.0:
-        return a, history
-    history.append(b)
-    fb = f(b, *args)
+        return a, history[:n]
+    history[n] = b
+    n = n + 1
+    fb = g(b)
     if fb == 0.0:
-        return b, history
+        return b, history[:n]
     if verbose:
         print("a=%.3e, fa=%.3e" % (a, fa))
         print("b=%.3e, fb=%.3e" % (b, fb))
-    if np.sign(fa) == np.sign(fb):
+    if (fa > 0.0) == (fb > 0.0):
         raise ValueError(u"The interval (a,b) does not bracket a root")
     k = 0
-    while abs(b - a) > reltolx * abs(b) + abstolx:
+    while math.fabs(b - a) > reltolx * math.fabs(b) + abstolx:
         c = a  # c=x(n-1)
         fc = fa
         a = b  # a=x(n)
         fa = fb
         t = fc / fb
         b = b + (b - c) / (t - 1.0)
-        fb = f(b, *args)
-        history.append(b)
+        fb = g(b)
+        history[n] = b
+        n = n + 1
         if fb == 0.0:
             break
         if verbose:
@@ -550,7 +878,7 @@ def secant(f, a, b, reltolx=None, abstolx=0.0, verbose=False, *args):
         k = k + 1
         if k > 100:
             raise ValueError(u"Maximum number of iterations reached!")
-    return b, history
+    return b, history[:n]
 
 
 def secantgui(f, a, b, reltolx=None, abstolx=0.0, *args):
@@ -581,7 +909,7 @@ def secantgui(f, a, b, reltolx=None, abstolx=0.0, *args):
     -------
     c : float
         The approximate root
-    history : list of floats
+    history : np.array
         The approximate roots computed
         during the iterations of the algorithm.
 
@@ -600,6 +928,99 @@ def secantgui(f, a, b, reltolx=None, abstolx=0.0, *args):
     return c, history
 
 
+def secant_vec(f, a, b, reltolx=None, abstolx=0.0, *args):
+    """
+    Solves several equations f(x)=0 by secant's method at the same time.
+
+    This is the vectorized version of secant.
+    Each component i of the arrays a and b defines an
+    independent equation, whose root is bracketed in (a[i], b[i]).
+    All the equations are solved together, so that the
+    function f is called once per iteration on the whole array.
+
+    The function f must be vectorized, i.e. have the calling sequence
+
+    y=f(x)
+
+    where x and y are arrays with the same shape as a and b.
+
+    If extra-arguments are provided in the args input
+    argument, the function f is supposed to have the calling
+    sequence
+
+        y=f(x,*args)
+
+    Parameters
+    ----------
+    f : function
+        The vectorized function involved in the non linear equations.
+    a : np.array
+        The left boundaries
+    b : np.array
+        The right boundaries
+    reltolx : float
+        The relative tolerance on x, reltolx>0.
+        Default is twice the machine epsilon
+    abstolx : float
+        The absolute tolerance on x.
+        We must have abstolx > 0.
+        Default is zero.
+    *args : list
+        The extra input arguments for f.
+
+    Returns
+    -------
+    c : np.array
+        The approximate roots
+    history : list of np.array
+        The approximate roots computed
+        during the iterations of the algorithm.
+
+    Examples
+    --------
+    >>> def myFunction(x, p):
+    >>>     y = x ** 2 - p
+    >>>     return y
+    >>>
+    >>> p = np.array([2.0, 3.0, 5.0])
+    >>> a = np.ones(3)
+    >>> b = np.full(3, 3.0)
+    >>> xs, history = secant_vec(myFunction, a, b, None, 0.0, p)
+    """
+    if reltolx is None:
+        reltolx = 2.0 * sys.float_info.epsilon
+    a = np.array(a, dtype=float)
+    b = np.array(b, dtype=float)
+    fa = f(a, *args)
+    fb = f(b, *args)
+    if np.any((np.sign(fa) == np.sign(fb)) & (fa != 0.0) & (fb != 0.0)):
+        raise ValueError(u"One interval (a,b) does not bracket a root")
+    # An equation is solved if f is zero at one of its end points
+    b = np.where(fa == 0.0, a, b)
+    fb = np.where(fa == 0.0, fa, fb)
+    active = fb != 0.0
+    history = [b.copy()]
+    k = 0
+    while True:
+        active &= np.abs(b - a) > reltolx * np.abs(b) + abstolx
+        if not np.any(active):
+            break
+        # The components which have converged may divide by zero
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = fa / fb
+            bnext = b + (b - a) / (t - 1.0)
+        a = np.where(active, b, a)
+        fa = np.where(active, fb, fa)
+        b = np.where(active, bnext, b)
+        fb = np.where(active, f(b, *args), fb)
+        history.append(b.copy())
+        active &= fb != 0.0
+        k = k + 1
+        if k > 100:
+            raise ValueError(u"Maximum number of iterations reached!")
+    return b, history
+
+
 def zeroin(f, a, b, reltolx=None, abstolx=0.0, verbose=False, *args):
     """
     Solves f(x)=0 by Dekker-Brent algorithm.
@@ -681,7 +1102,7 @@ def zeroin(f, a, b, reltolx=None, abstolx=0.0, verbose=False, *args):
     -------
     c : float
         The approximate root
-    history : list of floats
+    history : np.array
         The approximate roots computed
         during the iterations of the algorithm.
 
@@ -713,40 +1134,61 @@ def zeroin(f, a, b, reltolx=None, abstolx=0.0, verbose=False, *args):
     # Initialize.
     if reltolx == None:
         reltolx = 2.0 * sys.float_info.epsilon
-    fa = f(a, *args)
-    fb = f(b, *args)
+    # Bind the extra arguments once, outside of the loop
+    if args:
+        g = lambda x: f(x, *args)
+    else:
+        g = f
+    # The history only holds the iterates
+    history = np.empty(_HISTORY_SIZE)
+    fa = g(a)
+    if fa == 0.0:
+        return a, history[:0]
+    fb = g(b)
+    if fb == 0.0:
+        return b, history[:0]
     if verbose:
         step_name = "Start "
         print("%s. In [%.3e, %.3e]" % (step_name, a, b))
-    if np.sign(fa) == np.sign(fb):
+    # Signs of fa, fb and fc, only updated when the values are reassigned.
+    # Since fa and fb are never zero within the loop, they have the same
+    # sign if sign_a == sign_b.
+    sign_a = fa > 0.0
+    sign_b = fb > 0.0
+    if sign_a == sign_b:
         raise ValueError(u"Function must change sign on the interval")
     c = a
     fc = fa
+    sign_c = sign_a
     d = b - c
     e = d
-    history = list()
+    n = 0
     k = 0
     while fb != 0:
-        if np.sign(fa) == np.sign(fb):
+        if sign_a == sign_b:
             a = c
             fa = fc
+            sign_a = sign_c
             d = b - c
             e = d
-        if abs(fa) < abs(fb):
+        if math.fabs(fa) < math.fabs(fb):
             c = b
             b = a
             a = c
             fc = fb
             fb = fa
             fa = fc
+            sign_c = sign_b
+            sign_b = sign_a
+            sign_a = sign_c
         # Test convergence
         m = 0.5 * (a - b)
-        tol = reltolx * abs(b) + abstolx
-        if abs(m) <= tol or fb == 0.0:
+        tol = reltolx * math.fabs(b) + abstolx
+        if math.fabs(m) <= tol or fb == 0.0:
             break
         # Choose bisection or interpolation
         # Is bisection necessary?
-        if abs(e) < tol or abs(fc) <= abs(fb):
+        if math.fabs(e) < tol or math.fabs(fc) <= math.fabs(fb):
             # Bisection
             d = m
             e = m
@@ -763,8 +1205,9 @@ def zeroin(f, a, b, reltolx=None, abstolx=0.0, verbose=False, *args):
                 q = fc / fa
                 r = fb / fa
                 s = fb / fc
-                p = s * (2.0 * m * q * (q - r) - (b - c) * (r - 1.0))
-                q = (q - 1.0) * (r - 1.0) * (s - 1.0)
+                rm1 = r - 1.0
+                p = s * (2.0 * m * q * (q - r) - (b - c) * rm1)
+                q = (q - 1.0) * rm1 * (s - 1.0)
                 step_name = "IQI   "
             # Adjust signs
             if p > 0:
@@ -772,7 +1215,7 @@ def zeroin(f, a, b, reltolx=None, abstolx=0.0, verbose=False, *args):
             else:
                 p = -p
             # Is interpolated point acceptable
-            if 2.0 * p < min(3.0 * m * q - abs(tol * q), abs(e * q)):
+            if 2.0 * p < min(3.0 * m * q - math.fabs(tol * q), math.fabs(e * q)):
                 # Interpolation accepted
                 e = d
                 d = p / q
@@ -784,19 +1227,22 @@ def zeroin(f, a, b, reltolx=None, abstolx=0.0, verbose=False, *args):
         # Next point
         c = b
         fc = fb
-        if abs(d) > tol:
+        sign_c = sign_b
+        if math.fabs(d) > tol:
             b = b + d
         else:
-            b = b - np.sign(b - a) * tol
+            b = b - math.copysign(tol, b - a)
             step_name = "Small "
-        history.append(b)
-        fb = f(b, *args)
+        history[n] = b
+        n = n + 1
+        fb = g(b)
+        sign_b = fb > 0.0
         if verbose:
             print("%s. In [%.3e, %.3e]" % (step_name, a, b))
         k = k + 1
         if k > 100:
             raise ValueError(u"Maximum number of iterations reached!")
-    return b, history
+    return b, history[:n]
 
 
 def zeroingui(f, a, b, reltolx=None, abstolx=0.0, verbose=False, *args):
@@ -833,7 +1279,7 @@ def zeroingui(f, a, b, reltolx=None, abstolx=0.0, verbose=False, *args):
     -------
     c : float
         The approximate root
-    history : list of floats
+    history : np.array
         The approximate roots computed
         during the iterations of the algorithm.
 
@@ -855,6 +1301,148 @@ def zeroingui(f, a, b, reltolx=None, abstolx=0.0, verbose=False, *args):
     return b, history
 
 
+def zeroin_vec(f, a, b, reltolx=None, abstolx=0.0, *args):
+    """
+    Solves several equations f(x)=0 by Dekker-Brent algorithm at the same time.
+
+    This is the vectorized version of zeroin.
+    Each component i of the arrays a and b defines an
+    independent equation, whose root is bracketed in (a[i], b[i]).
+    All the equations are solved together, so that the
+    function f is called once per iteration on the whole array.
+
+    The steps of zeroin are made branchless: the bisection, secant
+    and IQI steps are computed for all the components, then the step
+    of each component is selected with masks.
+    Each component follows the same iterates as zeroin.
+
+    The function f must be vectorized, i.e. have the calling sequence
+
+    y=f(x)
+
+    where x and y are arrays with the same shape as a and b.
+
+    If extra-arguments are provided in the args input
+    argument, the function f is supposed to have the calling
+    sequence
+
+        y=f(x,*args)
+
+    Parameters
+    ----------
+    f : function
+        The vectorized function involved in the non linear equations.
+    a : np.array
+        The lower end points
+    b : np.array
+        The upper end points
+    reltolx : float
+        The relative tolerance on x, reltolx > 0.
+        Default is twice the machine epsilon
+    abstolx : float
+        The absolute tolerance on x.
+        We must have abstolx > 0.
+        Default is zero.
+    *args : list
+        The extra input arguments for f.
+
+    Returns
+    -------
+    b : np.array
+        The approximate roots
+    history : list of np.array
+        The approximate roots computed
+        during the iterations of the algorithm.
+
+    Examples
+    --------
+    >>> def myFunction(x, p):
+    >>>     y = x ** 2 - p
+    >>>     return y
+    >>>
+    >>> p = np.array([2.0, 3.0, 5.0])
+    >>> a = np.ones(3)
+    >>> b = np.full(3, 3.0)
+    >>> xs, history = zeroin_vec(myFunction, a, b, None, 0.0, p)
+    """
+    if reltolx is None:
+        reltolx = 2.0 * sys.float_info.epsilon
+    a = np.array(a, dtype=float)
+    b = np.array(b, dtype=float)
+    fa = f(a, *args)
+    fb = f(b, *args)
+    if np.any(((fa > 0.0) == (fb > 0.0)) & (fa != 0.0) & (fb != 0.0)):
+        raise ValueError(u"Function must change sign on the interval")
+    # An equation is solved if f is zero at one of its end points
+    b = np.where(fa == 0.0, a, b)
+    fb = np.where(fa == 0.0, fa, fb)
+    active = fb != 0.0
+    c = a.copy()
+    fc = fa.copy()
+    d = b - c
+    e = d.copy()
+    history = []
+    k = 0
+    while np.any(active):
+        # Restore the bracketing of the root by a and b
+        same_sign = active & ((fa > 0.0) == (fb > 0.0))
+        a = np.where(same_sign, c, a)
+        fa = np.where(same_sign, fc, fa)
+        d = np.where(same_sign, b - c, d)
+        e = np.where(same_sign, d, e)
+        # Make b the best approximation
+        swap = active & (np.abs(fa) < np.abs(fb))
+        c = np.where(swap, b, c)
+        fc = np.where(swap, fb, fc)
+        b = np.where(swap, a, b)
+        fb = np.where(swap, fa, fb)
+        a = np.where(swap, c, a)
+        fa = np.where(swap, fc, fa)
+        # Test convergence
+        m = 0.5 * (a - b)
+        tol = reltolx * np.abs(b) + abstolx
+        active &= np.abs(m) > tol
+        if not np.any(active):
+            break
+        # The components which do not use a step may divide by zero
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Linear interpolation (secant)
+            s = fb / fc
+            p_secant = 2.0 * m * s
+            q_secant = 1.0 - s
+            # Inverse quadratic interpolation
+            q = fc / fa
+            r = fb / fa
+            rm1 = r - 1.0
+            p_iqi = s * (2.0 * m * q * (q - r) - (b - c) * rm1)
+            q_iqi = (q - 1.0) * rm1 * (s - 1.0)
+        use_secant = a == c
+        p = np.where(use_secant, p_secant, p_iqi)
+        q = np.where(use_secant, q_secant, q_iqi)
+        # Adjust signs
+        q = np.where(p > 0.0, -q, q)
+        p = np.abs(p)
+        # Is the interpolated point acceptable?
+        accepted = 2.0 * p < np.minimum(3.0 * m * q - np.abs(tol * q), np.abs(e * q))
+        use_bisection = (np.abs(e) < tol) | (np.abs(fc) <= np.abs(fb)) | ~accepted
+        with np.errstate(divide="ignore", invalid="ignore"):
+            d_interpolation = p / q
+        e = np.where(active, np.where(use_bisection, m, d), e)
+        d = np.where(active, np.where(use_bisection, m, d_interpolation), d)
+        # Next point
+        c = np.where(active, b, c)
+        fc = np.where(active, fb, fc)
+        b_next = np.where(np.abs(d) > tol, b + d, b - np.copysign(tol, b - a))
+        b = np.where(active, b_next, b)
+        fb = np.where(active, f(b, *args), fb)
+        history.append(b.copy())
+        active &= fb != 0.0
+        k = k + 1
+        if k > 100:
+            raise ValueError(u"Maximum number of iterations reached!")
+    return b, history
+
+
 def test_problems():
     """
     Create a collection of nonlinear equation test problems.
@@ -1107,9 +1695,9 @@ def test_problems():
     def test_f(x):
         a = 2.0  # This is a free parameter
         if x >= a:
-            y = sqrt(x - a)
+            y = np.sqrt(x - a)
         else:
-            y = -sqrt(a - x)
+            y = -np.sqrt(a - x)
         return y
 
     a = 0.0
@@ -1222,6 +1810,67 @@ def test_problems():
     return test_collection
 
 
+def _solve_problem(method, problem):
+    """
+    Solve a test problem, returning the exception if the method fails.
+
+    Parameters
+    ----------
+    method : function
+        The solver, e.g. bisection or zeroin.
+    problem : dict
+        The test problem.
+
+    Returns
+    -------
+    result : tuple or Exception
+        The (xs, history) output of the method, or the ValueError
+        or ZeroDivisionError raised by the method.
+    """
+    try:
+        result = method(problem["function"], problem["a"], problem["b"])
+    except (ValueError, ZeroDivisionError) as exception:
+        result = exception
+    return result
+
+
+def solve_all(test_collection, method=zeroin):
+    """
+    Solve a collection of test problems.
+
+    The problems are solved one after the other. The solvers are
+    pure Python functions, so that threads would give no speedup.
+    A failing problem does not stop the others: its entry in the
+    results is the exception raised by the method.
+
+    Parameters
+    ----------
+    test_collection : list of dict
+        The test problems, see test_problems.
+    method : function
+        The solver, which must have the calling sequence
+        xs, history = method(f, a, b).
+
+    Returns
+    -------
+    results : list
+        For each problem, the (xs, history) output of the method,
+        or the ValueError or ZeroDivisionError raised by the method.
+
+    Examples
+    --------
+    >>> test_collection = test_problems()
+    >>> results = solve_all(test_collection, zeroin)
+    >>> failures = [
+    >>>     problem["name"]
+    >>>     for problem, result in zip(test_collection, results)
+    >>>     if isinstance(result, Exception)
+    >>> ]
+    """
+    results = [_solve_problem(method, problem) for problem in test_collection]
+    return results
+
+
 def iqi(f, a, b, c, reltolx=None, abstolx=0.0, verbose=False, *args):
     """
     Solves f(x)=0 by Inverse Quadratic Interpolation.
@@ -1239,6 +1888,13 @@ def iqi(f, a, b, c, reltolx=None, abstolx=0.0, verbose=False, *args):
 
     On output we have abs(b-a)<=reltolx*max(abs(c),1.).
 
+    When two of the function values are nearly equal, the
+    interpolation suffers from cancellation: a secant step on the
+    two latest points is used instead.
+    Like the secant method, the algorithm then converges
+    superlinearly near a simple root, but there is no guarantee
+    far from the root: the safeguarded zeroin should be preferred.
+
     The function f must have the calling sequence:
 
     y=f(x)
@@ -1282,7 +1938,7 @@ def iqi(f, a, b, c, reltolx=None, abstolx=0.0, verbose=False, *args):
     -------
     c : float
         The approximate root.
-    history : list of floats
+    history : np.array
         The approximate roots computed
         of the iterations of the algorithm
 
@@ -1296,32 +1952,53 @@ def iqi(f, a, b, c, reltolx=None, abstolx=0.0, verbose=False, *args):
     """
     if reltolx == None:
         reltolx = 2.0 * sys.float_info.epsilon
-    history = [a, b, c]
-    fa = f(a, *args)
-    fb = f(b, *args)
-    fc = f(c, *args)
+    # Bind the extra arguments once, outside of the loop
+    if args:
+        g = lambda x: f(x, *args)
+    else:
+        g = f
+    history = np.empty(_HISTORY_SIZE)
+    history[0:3] = (a, b, c)
+    n = 3
+    fa = g(a)
+    fb = g(b)
+    fc = g(c)
     k = 0
-    while abs(c - b) > reltolx * abs(c) + abstolx:
-        if fa == fb or fa == fc or fb == fc:
+    while math.fabs(c - b) > reltolx * math.fabs(c) + abstolx:
+        if fb == fc:
             print(u"Warning : Cannot interpolate!")
             print(u"a=", a, ", fa=", fa)
             print(u"b=", b, ", fb=", fb)
             print(u"c=", c, ", fc=", fc)
             break
-        x = polynomial_interpolation([fa, fb, fc], [a, b, c], 0.0)
-        x = x[0]
+        if (
+            math.isclose(fa, fb, rel_tol=_IQI_RELTOL)
+            or math.isclose(fa, fc, rel_tol=_IQI_RELTOL)
+            or math.isclose(fb, fc, rel_tol=_IQI_RELTOL)
+        ):
+            # Secant step on the two latest points
+            x = c - fc * (c - b) / (fc - fb)
+        else:
+            # Value at y=0 of the polynomial interpolating the points (f(x), x).
+            # Each Lagrange basis polynomial is a product of ratios,
+            # which cannot overflow as the product of the function values.
+            t1 = a * (fb / (fb - fa)) * (fc / (fc - fa))
+            t2 = b * (fa / (fa - fb)) * (fc / (fc - fb))
+            t3 = c * (fa / (fa - fc)) * (fb / (fb - fc))
+            x = t1 + t2 + t3
         a = b
         fa = fb
         b = c
         fb = fc
         c = x
-        fc = f(x, *args)
-        history.append(c)
+        fc = g(x)
+        history[n] = c
+        n = n + 1
         k = k + 1
         if k > 100:
             print(u"Warning : maximum number of iterations reached!")
             break
-    return c, history
+    return c, history[:n]
 
 
 def iqigui(f, a, b, c, reltolx=None, abstolx=0.0, verbose=False, *args):
@@ -1356,7 +2033,7 @@ def iqigui(f, a, b, c, reltolx=None, abstolx=0.0, verbose=False, *args):
     -------
     c : float
         The approximate root.
-    history : list of floats
+    history : np.array
         The approximate roots computed
         of the iterations of the algorithm
 
@@ -1368,12 +2045,12 @@ def iqigui(f, a, b, c, reltolx=None, abstolx=0.0, verbose=False, *args):
     >>>
     >>> xs, history = iqigui(myFunction, 1.0, 2.0, 3.0)
     """
+    import pylab as pl
+
     # Plot the function
     N = 100
     x = np.linspace(min(a, b, c), max(a, b, c), N)
-    y = np.zeros((N, 1))
-    for i in range(N):
-        y[i] = f(x[i], *args)
+    y = _function_values(f, x, *args)
     pl.plot(x, y, "r-")
     pl.xlabel(u"x")
     pl.ylabel(u"f(x)")
@@ -1382,6 +2059,117 @@ def iqigui(f, a, b, c, reltolx=None, abstolx=0.0, verbose=False, *args):
     return c, history
 
 
+def iqi_vec(f, a, b, c, reltolx=None, abstolx=0.0, *args):
+    """
+    Solves several equations f(x)=0 by Inverse Quadratic Interpolation.
+
+    This is the vectorized version of iqi.
+    Each component i of the arrays a, b and c defines an
+    independent equation, with starting points a[i], b[i] and c[i].
+    All the equations are solved together, so that the
+    function f is called once per iteration on the whole array.
+
+    A component stops when it has converged, or when its two
+    latest function values are equal.
+    When two of its function values are nearly equal,
+    a secant step is used instead of the interpolation.
+
+    The function f must be vectorized, i.e. have the calling sequence
+
+    y=f(x)
+
+    where x and y are arrays with the same shape as a, b and c.
+
+    If extra-arguments are provided in the args input
+    argument, the function f is supposed to have the calling
+    sequence
+
+        y=f(x,*args)
+
+    Parameters
+    ----------
+    f : function
+        The vectorized function involved in the non linear equations.
+    a : np.array
+        The first points.
+    b : np.array
+        The second points.
+    c : np.array
+        The third points.
+    reltolx : float
+        The relative tolerance on x.
+        We must have reltolx>0.
+        Default is twice the machine epsilon.
+    abstolx : float
+        The absolute tolerance on x.
+        We must have abstolx > 0.
+        Default is zero.
+    *args : list
+        The extra input arguments for f.
+
+    Returns
+    -------
+    c : np.array
+        The approximate roots.
+    history : list of np.array
+        The approximate roots computed
+        during the iterations of the algorithm.
+
+    Examples
+    --------
+    >>> def myFunction(x, p):
+    >>>     y = x ** 2 - p
+    >>>     return y
+    >>>
+    >>> p = np.array([2.0, 3.0, 5.0])
+    >>> a = np.ones(3)
+    >>> b = np.full(3, 2.0)
+    >>> c = np.full(3, 3.0)
+    >>> xs, history = iqi_vec(myFunction, a, b, c, None, 0.0, p)
+    """
+    if reltolx is None:
+        reltolx = 2.0 * sys.float_info.epsilon
+    a = np.array(a, dtype=float)
+    b = np.array(b, dtype=float)
+    c = np.array(c, dtype=float)
+    history = [a.copy(), b.copy(), c.copy()]
+    fa = f(a, *args)
+    fb = f(b, *args)
+    fc = f(c, *args)
+    active = np.ones(np.shape(c), dtype=bool)
+    k = 0
+    while True:
+        active &= np.abs(c - b) > reltolx * np.abs(c) + abstolx
+        # Cannot interpolate nor use the secant if fb and fc are equal
+        active &= fb != fc
+        if not np.any(active):
+            break
+        degenerate = (
+            np.isclose(fa, fb, rtol=_IQI_RELTOL, atol=0.0)
+            | np.isclose(fa, fc, rtol=_IQI_RELTOL, atol=0.0)
+            | np.isclose(fb, fc, rtol=_IQI_RELTOL, atol=0.0)
+        )
+        # The components which have stopped may divide by zero
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t1 = a * (fb / (fb - fa)) * (fc / (fc - fa))
+            t2 = b * (fa / (fa - fb)) * (fc / (fc - fb))
+            t3 = c * (fa / (fa - fc)) * (fb / (fb - fc))
+            secant = c - fc * (c - b) / (fc - fb)
+        x = np.where(degenerate, secant, t1 + t2 + t3)
+        a = np.where(active, b, a)
+        fa = np.where(active, fb, fa)
+        b = np.where(active, c, b)
+        fb = np.where(active, fc, fb)
+        c = np.where(active, x, c)
+        fc = np.where(active, f(c, *args), fc)
+        history.append(c.copy())
+        k = k + 1
+        if k > 100:
+            print(u"Warning : maximum number of iterations reached!")
+            break
+    return c, history
+
+
 if __name__ == "__main__":
     from math import sqrt
     from floats import computeDigits
@@ -1441,6 +2229,13 @@ if __name__ == "__main__":
     xs, history = bisection(myFunction, 1.0, 2.0)
     xexact = np.sqrt(2.0)
     np.testing.assert_almost_equal(xs, xexact, decimal=4)
+    # The general case produces the same iterates as the default one
+    xs2, history2 = bisection(myFPar, 1.0, 2.0, None, 0.0, False, 1.0, 2.0)
+    assert xs2 == xs
+    np.testing.assert_equal(history2, history)
+    # The midpoint of large bounds with opposite signs does not overflow
+    xs_large, history_large = bisection(lambda x: x, -1.7e308, 1.7e308)
+    assert xs_large == 0.0
     print(u"Approximate Solution:", xs)
     print(u"history:", history)
     print(u"Number of iterations:", len(history))
@@ -1476,6 +2271,22 @@ if __name__ == "__main__":
     xs, history = zeroin(myFunction, 1.0, 2.0, verbose=True)
     xexact = np.sqrt(2.0)
     np.testing.assert_almost_equal(xs, xexact, decimal=4)
+    # Root at the bound
+    xs, history = zeroin(lambda x: x - 1.0, 1.0, 2.0)
+    assert xs == 1.0 and len(history) == 0
+
+    # Solve all the test problems
+    test_collection = test_problems()
+    results = solve_all(test_collection, zeroin)
+    # zeroin reaches the maximum number of iterations on these problems
+    failing_problems = ["Brent1", "Brent2"]
+    for problem, result in zip(test_collection, results):
+        if problem["name"] in failing_problems:
+            assert isinstance(result, ValueError)
+        else:
+            xs, history = zeroin(problem["function"], problem["a"], problem["b"])
+            assert result[0] == xs
+            np.testing.assert_equal(result[1], history)
 
     # IQI
     xs, history = iqi(myFunction, 1.0, 2.0, 3.0)
@@ -1485,11 +2296,76 @@ if __name__ == "__main__":
     print(u"history:", history)
     print(u"Number of iterations:", len(history))
     print(u"Digits:", computeDigits(xs, xexact))
+    # f(-1)=f(1): a secant step replaces the interpolation
+    xs, history = iqi(myFunction, -1.0, 1.0, 2.0)
+    np.testing.assert_almost_equal(xs, xexact, decimal=14)
+    # Large or tiny function values: the interpolation does not overflow
+    problems = {problem["name"]: problem for problem in test_problems()}
+    xs, history = iqi(problems["Baudin1"]["function"], 350.0, 400.0, 450.0)
+    assert xs == 400.0
+    xs, history = iqi(problems["Baudin2"]["function"], -350.0, -400.0, -450.0)
+    assert xs == -400.0
     if runGraphics:
         xs, history = bisectiongui(myFunction, 1.0, 2.0)
         np.testing.assert_almost_equal(xs, xexact, decimal=4)
 
+    # Vectorized solvers
+    def myFParVec(x, p):
+        y = x ** 2 - p
+        return y
+
+    def myFPrimeParVec(x, p):
+        y = 2 * x
+        return y
+
+    p = np.array([2.0, 3.0, 5.0, 7.0, 4.0])
+    xexact = np.sqrt(p)
+    a = np.ones(p.size)
+    b = np.full(p.size, 3.0)
+    xs, history = bisection_vec(myFParVec, a, b, None, 0.0, p)
+    np.testing.assert_almost_equal(xs, xexact, decimal=4)
+    print(u"bisection_vec, Approximate Solution:", xs)
+    print(u"Number of iterations:", len(history))
+    xs, history = secant_vec(myFParVec, a, b, None, 0.0, p)
+    np.testing.assert_almost_equal(xs, xexact, decimal=4)
+    print(u"secant_vec, Approximate Solution:", xs)
+    print(u"Number of iterations:", len(history))
+    xs, history = newton_vec(myFParVec, a, myFPrimeParVec, None, 0.0, p)
+    np.testing.assert_almost_equal(xs, xexact, decimal=4)
+    print(u"newton_vec, Approximate Solution:", xs)
+    print(u"Number of iterations:", len(history))
+    xs, history = zeroin_vec(myFParVec, a, b, None, 0.0, p)
+    np.testing.assert_almost_equal(xs, xexact, decimal=4)
+    print(u"zeroin_vec, Approximate Solution:", xs)
+    print(u"Number of iterations:", len(history))
+    # Each component follows the iterates of zeroin
+    for i in range(len(p)):
+        xs_i, history_i = zeroin(myFParVec, a[i], b[i], None, 0.0, False, p[i])
+        assert xs[i] == xs_i
+    c = np.full(p.size, 1.5)
+    xs, history = iqi_vec(myFParVec, a, c, b, None, 0.0, p)
+    np.testing.assert_almost_equal(xs, xexact, decimal=4)
+    print(u"iqi_vec, Approximate Solution:", xs)
+    print(u"Number of iterations:", len(history))
+    # Each component follows the iterates of iqi
+    for i in range(len(p)):
+        xs_i, history_i = iqi(myFParVec, a[i], c[i], b[i], None, 0.0, False, p[i])
+        assert xs[i] == xs_i
+
     # Benchmark
+    # Centered finite difference step for the derivative in Newton's method
+    h = sys.float_info.epsilon ** (1.0 / 3.0)
+
+    def make_derivative(f):
+        def function_derivative(x):
+            xp = x + h
+            xm = x - h
+            twice_h = xp - xm
+            y = (f(xp) - f(xm)) / twice_h
+            return y
+
+        return function_derivative
+
     test_collection = test_problems()
     for problem in test_collection:
         # bisection
@@ -1536,15 +2412,7 @@ if __name__ == "__main__":
             % (problem["name"], digits, len(history), abs_error)
         )
         # newton
-        def function_derivative(x):
-            h = sys.float_info.epsilon ** (1.0 / 3.0)
-            f = problem["function"]
-            xp = x + h
-            xm = x - h
-            twice_h = xp - xm
-            y = (f(x + h) - f(x - h)) / twice_h
-            return y
-
+        function_derivative = make_derivative(problem["function"])
         try:
             xs, history = newton(problem["function"], problem["a"], function_derivative)
             digits = computeDigits(xs, problem["root"])
@@ -53,15 +53,55 @@ def polynomial_interpolation(x, y, u):
     Numerical mathematics. Vol. 37. Springer Science & Business Media, 2010.
     p.333 and p.340.
     """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    u = np.ravel(u)
     n = np.size(x)
-    v = np.zeros(np.size(u))
-    for k in range(n):
-        w = np.ones(np.size(u))
-        # j=0,...,k-1,k+1,...,n-1
-        for j in list(range(k)) + list(range(k + 1, n)):
-            # Elementwise product
-            w = w * (u - x[j]) / (x[k] - x[j])
-        v = v + w * y[k]
+    if n == 3:
+        v = _quadratic_interpolation(x[0], x[1], x[2], y[0], y[1], y[2], u)
+        return v
+    # Lagrange polynomials L[k] at points u.
+    # Multiply and divide by one factor at a time, so that the
+    # products stay in range.
+    L = np.ones((n, np.size(u)))
+    for j in range(n):
+        # All the polynomials k != j have the factor (u - x[j]) / (x[k] - x[j])
+        others = np.arange(n) != j
+        L[others] = L[others] * (u - x[j]) / (x[others, None] - x[j])
+    v = y @ L
+    return v
+
+
+def _quadratic_interpolation(x0, x1, x2, y0, y1, y2, u):
+    """
+    Polynomial interpolation with three points.
+
+    Computes the value at u of the polynomial P of degree 2 such that
+    P(x0) = y0, P(x1) = y1 and P(x2) = y2, using the closed form
+    of the Lagrange polynomials.
+
+    Parameters
+    ----------
+    x0, x1, x2 : float
+        The x observations
+    y0, y1, y2 : float
+        The y observations
+    u : float or numpy.array(m)
+        The evaluation points
+
+    Returns
+    -------
+    v : float or numpy.array(m)
+        The value of the polynomial at point u
+    """
+    d01 = x0 - x1
+    d02 = x0 - x2
+    d12 = x1 - x2
+    # Products of ratios, which do not overflow as the products of differences
+    L0 = ((u - x1) / d01) * ((u - x2) / d02)
+    L1 = ((u - x0) / -d01) * ((u - x2) / d12)
+    L2 = ((u - x0) / d02) * ((u - x1) / d12)
+    v = L0 * y0 + L1 * y1 + L2 * y2
     return v
 
 
@@ -102,9 +142,7 @@ def piecewise_linear(x, y, u):
     # Find subinterval indices k so
     # that x[k] <= u < x[k + 1]
     n = np.size(x)
-    k = np.zeros(np.size(u), dtype=int)
-    for j in range(1, n - 1):
-        k[x[j] <= u] = j
+    k = np.clip(np.searchsorted(x, u, side="right") - 1, 0, n - 2)
     # Evaluate interpolant
     s = u - x[k]
     v = y[k] + s * delta[k]
@@ -169,15 +207,65 @@ def spline_interpolation(x, y, u, siderule="natural"):
     b = (d[0 : n - 1] - 2 * delta + d[1:n]) / h ** 2
     #  Find subinterval indices k
     # so that x(k) <= u < x(k+1)
-    k = np.zeros(np.size(u), dtype=int)
-    for j in range(1, n - 1):
-        k[x[j] <= u] = j
-    #  Evaluate spline
+    k = np.clip(np.searchsorted(x, u, side="right") - 1, 0, n - 2)
+    #  Evaluate spline with Horner's method, in place:
+    #  v = y[k] + s * (d[k] + s * (c[k] + s * b[k]))
     s = u - x[k]
-    v = y[k] + s * (d[k] + s * (c[k] + s * b[k]))
+    v = b[k]
+    v *= s
+    v += c[k]
+    v *= s
+    v += d[k]
+    v *= s
+    v += y[k]
     return v
 
 
+def _spline_interior_system(h, delta):
+    """
+    Interior rows of the tridiagonal system for the slopes of the spline.
+
+    The rows 1, ..., n - 2 are the same for all end conditions.
+    The entries of the first and last rows are left uninitialized,
+    and must be set by the caller.
+    The arrays are filled in place, without temporary arrays.
+
+    Parameters
+    ----------
+    h : np.array(n - 1)
+        Differences of x nodes values.
+    delta : np.array(n - 1)
+        Ratio of the difference of y values to h.
+
+    Returns
+    -------
+    a : np.array(n - 1)
+        The sub-diagonal.
+    b : np.array(n)
+        The diagonal.
+    c : np.array(n - 1)
+        The super-diagonal.
+    r : np.array(n)
+        The right-hand side.
+    """
+    n = np.size(h) + 1
+    a = np.empty(n - 1)
+    b = np.empty(n)
+    c = np.empty(n - 1)
+    r = np.empty(n)
+    a[0 : n - 2] = h[1 : n - 1]
+    # b[i] = 2 * (h[i] + h[i - 1])
+    np.add(h[1 : n - 1], h[0 : n - 2], out=b[1 : n - 1])
+    b[1 : n - 1] *= 2
+    c[1 : n - 1] = h[0 : n - 2]
+    # r[i] = 3 * (h[i] * delta[i - 1] + h[i - 1] * delta[i])
+    rows = r[1 : n - 1]
+    np.multiply(h[1 : n - 1], delta[0 : n - 2], out=rows)
+    rows += h[0 : n - 2] * delta[1 : n - 1]
+    rows *= 3
+    return a, b, c, r
+
+
 def spline_slopes_not_a_knot(h, delta):
     """
     Slopes for cubic spline interpolation.
@@ -219,22 +307,13 @@ def spline_slopes_not_a_knot(h, delta):
     """
     # Diagonals of tridiagonal system
     n = np.size(h) + 1
-    a = np.zeros(n - 1)
-    b = np.zeros(n)
-    c = np.zeros(n - 1)
-    r = np.zeros(n)
-    a[0 : n - 2] = h[1 : n - 1]
+    a, b, c, r = _spline_interior_system(h, delta)
     a[n - 2] = h[n - 3] + h[n - 2]
     b[0] = h[1]
-    b[1 : n - 1] = 2 * (h[1 : n - 1] + h[0 : n - 2])
     b[n - 1] = h[n - 3]
     c[0] = h[0] + h[1]
-    c[1 : n - 1] = h[0 : n - 2]
     # Right-hand side
     r[0] = ((h[0] + 2 * c[0]) * h[1] * delta[0] + h[0] ** 2 * delta[1]) / c[0]
-    r[1 : n - 1] = 3 * (
-        h[1 : n - 1] * delta[0 : n - 2] + h[0 : n - 2] * delta[1 : n - 1]
-    )
     r[n - 1] = (
         h[n - 2] ** 2 * delta[n - 3]
         + (2 * a[n - 2] + h[n - 2]) * h[n - 3] * delta[n - 2]
@@ -286,22 +365,13 @@ def spline_slopes_natural(h, delta):
     """
     # Diagonals of tridiagonal system
     n = np.size(h) + 1
-    a = np.zeros(n - 1)
-    b = np.zeros(n)
-    c = np.zeros(n - 1)
-    r = np.zeros(n)
-    a[0 : n - 2] = h[1 : n - 1]
+    a, b, c, r = _spline_interior_system(h, delta)
     a[n - 2] = 1
     b[0] = 2
-    b[1 : n - 1] = 2 * (h[1 : n - 1] + h[0 : n - 2])
     b[n - 1] = 2
     c[0] = 1
-    c[1 : n - 1] = h[0 : n - 2]
     # Right-hand side
     r[0] = 3 * delta[0]
-    r[1 : n - 1] = 3 * (
-        h[1 : n - 1] * delta[0 : n - 2] + h[0 : n - 2] * delta[1 : n - 1]
-    )
     r[n - 1] = 3 * delta[n - 2]
     # Solve tridiagonal linear system
     d = tridiagonal_solve(a, b, c, r)
@@ -353,12 +423,16 @@ def tridiagonal_solve(a, b, c, d):
     Society for industrial and applied mathematics, 2002. p.174.
     """
     n = len(d)
+    # Elimination: one division per row
     for i in range(n - 1):
-        d[i + 1] -= d[i] * a[i] / b[i]
-        b[i + 1] -= c[i] * a[i] / b[i]
-    for i in list(range(n - 2, -1, -1)):
-        d[i] -= d[i + 1] * c[i] / b[i + 1]
-    x = d / b
+        w = a[i] / b[i]
+        b[i + 1] -= c[i] * w
+        d[i + 1] -= d[i] * w
+    # Back substitution
+    x = np.empty(n)
+    x[n - 1] = d[n - 1] / b[n - 1]
+    for i in range(n - 2, -1, -1):
+        x[i] = (d[i] - c[i] * x[i + 1]) / b[i]
     return x
 
 
@@ -384,8 +458,7 @@ def compute_Chebyshev_roots(n, a=-1.0, b=1.0):
     """
     k = np.array(range(n))
     roots = -np.cos((2 * (k + 1) - 1) * np.pi / (2 * n))
-    roots_array = np.array(roots)
-    scaled_roots = 0.5 * ((b - a) * roots_array + a + b)
+    scaled_roots = 0.5 * ((b - a) * roots + a + b)
     return scaled_roots
 
 
@@ -405,7 +478,7 @@ def compute_Chebyshev_polynomial(n, x_scaled):
     y : float or np.array(n)
         The polynomial value.
     """
-    if len(x_scaled[x_scaled < -1.0]) > 0 or len(x_scaled[x_scaled > 1.0] > 0):
+    if np.any((x_scaled < -1.0) | (x_scaled > 1.0)):
         raise ValueError("x must be in [-1, 1]")
     y = np.cos(n * np.arccos(x_scaled))
     return y
@@ -473,6 +546,14 @@ if __name__ == "__main__":
         pl.plot(u, v, "-")
         pl.title(u"Polynomial interpolation")
 
+    # Large or tiny nodes: the Lagrange polynomials do not overflow
+    v = polynomial_interpolation(1.0e80 * x[1:], x[1:] ** 2, 2.5e80)
+    np.testing.assert_allclose(v, [6.25])
+    v = polynomial_interpolation(1.0e-120 * x[1:5], x[1:5] ** 2, 2.5e-120)
+    np.testing.assert_allclose(v, [6.25])
+    v = polynomial_interpolation(1.0e160 * x[1:4], x[1:4] ** 2, 2.5e160)
+    np.testing.assert_allclose(v, [6.25])
+
     # Spline naturelle
     nu = 100
     u = np.linspace(-0.25, 5.25, nu)
@@ -8,7 +8,103 @@ Reference
 Michaël Baudin, "Introduction aux méthodes numériques". 
 Dunod. Collection Sciences Sup. (2023)
 """
+import functools
 import numpy as np
+from scipy.linalg import cho_factor, cho_solve, solve_triangular
+
+
+def _vander(t, n):
+    """
+    Vandermonde matrix with powers in decreasing order.
+
+    Same as np.vander(t, n + 1). The matrix is stored by columns,
+    so that each power is computed in place from the next one,
+    in a contiguous column.
+
+    Parameters
+    ----------
+    t : np.array(m)
+        The x observations.
+    n : int, n>=0,
+        The degree of the polynomial
+
+    Returns
+    -------
+    X : np.array(m, n + 1)
+        The matrix with X[i, j] = t[i]^(n - j).
+    """
+    t = np.asarray(t, dtype=float)
+    X = np.empty((np.size(t), n + 1), order="F")
+    X[:, n] = 1.0
+    for k in range(n - 1, -1, -1):
+        np.multiply(X[:, k + 1], t, out=X[:, k])
+    return X
+
+
+@functools.lru_cache(maxsize=16)
+def _normal_equations_factors(t_bytes, n):
+    """
+    Vandermonde matrix and Cholesky factor of the normal equations.
+
+    The result only depends on t and n, so that it is cached:
+    fitting several y on the same t factorizes the matrix once.
+    The returned arrays must not be modified.
+
+    Parameters
+    ----------
+    t_bytes : bytes
+        The x observations, as the bytes of a float64 array.
+    n : int, n>=0,
+        The degree of the polynomial
+
+    Returns
+    -------
+    X : np.array(m, n + 1)
+        The Vandermonde matrix.
+    A : np.array(n + 1, n + 1)
+        The matrix X.T @ X of the normal equations.
+    factor : tuple
+        The Cholesky factor of A, as returned by cho_factor.
+        None if A is not numerically positive definite.
+    """
+    t = np.frombuffer(t_bytes)
+    X = _vander(t, n)
+    A = X.T @ X
+    try:
+        factor = cho_factor(A)
+    except np.linalg.LinAlgError:
+        # A is ill-conditioned: rounding errors make it indefinite
+        factor = None
+    return X, A, factor
+
+
+@functools.lru_cache(maxsize=16)
+def _qr_factors(t_bytes, n):
+    """
+    QR decomposition of the Vandermonde matrix.
+
+    The result only depends on t and n, so that it is cached:
+    fitting several y on the same t factorizes the matrix once.
+    The returned arrays must not be modified.
+
+    Parameters
+    ----------
+    t_bytes : bytes
+        The x observations, as the bytes of a float64 array.
+    n : int, n>=0,
+        The degree of the polynomial
+
+    Returns
+    -------
+    Q : np.array(m, n + 1)
+        The orthogonal factor.
+    R : np.array(n + 1, n + 1)
+        The upper triangular factor.
+    """
+    t = np.frombuffer(t_bytes)
+    X = _vander(t, n)
+    Q, R = np.linalg.qr(X)
+    return Q, R
 
 
 def polynomial_fit_normal_equations(t, y, n):
@@ -62,10 +158,15 @@ def polynomial_fit_normal_equations(t, y, n):
     Society for Industrial and Applied Mathematics, 1996.
     p.7.
     """
-    X = np.vander(t, n + 1)
-    A = X.T @ X
+    t = np.ascontiguousarray(t, dtype=float)
+    X, A, factor = _normal_equations_factors(t.tobytes(), n)
     b = X.T @ y
-    bet = np.linalg.solve(A, b)
+    if factor is None:
+        # The Cholesky decomposition failed: use the general solver
+        bet = np.linalg.solve(A, b)
+    else:
+        # X.T @ X is symmetric positive definite: use the Cholesky decomposition
+        bet = cho_solve(factor, b)
     return bet
 
 
@@ -100,9 +201,8 @@ def polynomial_value(bet, u):
     >>> u = np.linspace(1970.0, 2020.0, 100)
     >>> v = polynomial_value(bet, u)
     """
-    n = np.size(bet)
-    X = np.vander(u, n)
-    v = np.dot(X, bet)
+    # Horner's method
+    v = np.polyval(bet, u)
     return v
 
 
@@ -159,10 +259,11 @@ def polynomial_fit(t, y, n):
     Society for Industrial and Applied Mathematics, 1996.
     p.21.
     """
-    X = np.vander(t, n + 1)
-    Q, R = np.linalg.qr(X)
+    t = np.ascontiguousarray(t, dtype=float)
+    Q, R = _qr_factors(t.tobytes(), n)
     z = np.dot(np.transpose(Q), y)
-    bet = np.linalg.solve(R, z)
+    # R is upper triangular: use back substitution
+    bet = solve_triangular(R, z)
     return bet
 
 
@@ -212,6 +313,11 @@ if __name__ == "__main__":
     print(u"bet=", bet)
     beta_reference = np.array([6.906, -6.222, 3.208, 0.2450])
     np.testing.assert_allclose(bet, beta_reference, 1.0e-3)
+    # Ill-conditioned normal equations: Cholesky fails, the fit does not
+    t_ill = np.linspace(0.0, 1.0, 20)
+    bet_ill = polynomial_fit_normal_equations(t_ill, np.sin(t_ill), 15)
+    assert _normal_equations_factors(t_ill.tobytes(), 15)[2] is None
+    assert np.all(np.isfinite(bet_ill))
 
     # Evaluate and plot
     u = np.linspace(1970.0, 2020.0, 100)
@@ -231,6 +337,11 @@ if __name__ == "__main__":
     print(u"bet=", bet)
     np.testing.assert_allclose(bet, beta_reference, 1.0e-3)
 
+    # The factorizations are reused when the same t is fitted again
+    bet2 = polynomial_fit(s, 2.0 * y, 3)
+    np.testing.assert_allclose(bet2, 2.0 * bet)
+    assert _qr_factors.cache_info().hits == 1
+
     # polynomial_value
     u = np.array([1990.0, 2000.0, 2010.0])
     u_scaled = (u - min(t)) / (max(t) - min(t))
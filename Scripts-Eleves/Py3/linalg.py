@@ -7,7 +7,8 @@ Reference
 Michaël Baudin, "Introduction aux méthodes numériques". 
 Dunod. Collection Sciences Sup. (2023)
 """
-from numpy import zeros, argmax, tril, triu, array, eye, outer
+from numpy import zeros, empty, absolute, argmax, tril, triu, array, outer
+from numpy import fill_diagonal, multiply
 
 
 def backward_substitution(U, b):
@@ -15,17 +16,20 @@ def backward_substitution(U, b):
     Solves U @ x = b, where U is upper triangular.
 
     Uses backward substitution.
+    The right hand side b is not modified.
+    Several systems with the same matrix can be solved at once,
+    with their right hand sides in the columns of b.
 
     Parameters
     ----------
     U : np.array((n, n))
         An upper triangular matrix
-    b : np.array(n)
+    b : np.array(n) or np.array((n, m))
         The right hand side
 
     Returns
     -------
-    x : np.array(n)
+    x : np.array(n) or np.array((n, m))
         The solution
 
     Example
@@ -45,10 +49,13 @@ def backward_substitution(U, b):
     Numerical Computing with Matlab, Cleve Moler, 2008
     """
     n = U.shape[0]
-    x = zeros((n))
+    # Work on a floating point copy of the right hand side
+    b = array(b, dtype=float)
+    x = zeros(b.shape)
     for k in range(n - 1, -1, -1):
         x[k] = b[k] / U[k, k]
-        b[0:k] = b[0:k] - U[0:k, k] * x[k]
+        # Update in place: no temporary for the difference
+        b[0:k] -= multiply.outer(U[0:k, k], x[k])
     return x
 
 
@@ -57,17 +64,20 @@ def forward_elimination(L, b):
     Solves L @ x = b, where L is lower triangular.
 
     Uses forward elimination.
+    The right hand side b is not modified.
+    Several systems with the same matrix can be solved at once,
+    with their right hand sides in the columns of b.
 
     Parameters
     ----------
     U : np.array((n, n))
         A lower triangular matrix
-    b : np.array(n)
+    b : np.array(n) or np.array((n, m))
         The right hand side
 
     Returns
     -------
-    x : np.array(n)
+    x : np.array(n) or np.array((n, m))
         The solution
 
     Example
@@ -87,10 +97,13 @@ def forward_elimination(L, b):
     Numerical Computing with Matlab, Cleve Moler, 2008
     """
     n = L.shape[0]
-    x = zeros((n))
+    # Work on a floating point copy of the right hand side
+    b = array(b, dtype=float)
+    x = zeros(b.shape)
     for k in range(n):
         x[k] = b[k] / L[k, k]
-        b[k + 1 : n] = b[k + 1 : n] - L[k + 1 : n, k] * x[k]
+        # Update in place: no temporary for the difference
+        b[k + 1 : n] -= multiply.outer(L[k + 1 : n, k], x[k])
     return x
 
 
@@ -136,25 +149,30 @@ def lu_decomposition(A):
     """
     n = A.shape[0]
     p = list(range(n))
+    # Buffer for the absolute values of the k-th column
+    scratch = empty(n)
+    # Buffer for the row swaps
+    row = empty(n, dtype=A.dtype)
     for k in range(n - 1):
         # Find largest element below diagonal in k-th column
-        m = argmax(abs(A[k:n, k]))
+        m = argmax(absolute(A[k:n, k], out=scratch[0 : n - k]))
         m = m + k
         # Swap pivot row
         if m != k:
-            A[[k, m], :] = A[[m, k], :]
+            row[:] = A[k, :]
+            A[k, :] = A[m, :]
+            A[m, :] = row
             p[m], p[k] = p[k], p[m]
         # Skip elimination if pivot is zero
         if A[k, k] == 0.0:
             raise ValueError("Error : zero pivot !")
         # Compute multipliers
-        A[k + 1 : n, k] = A[k + 1 : n, k] / A[k, k]
-        # Update the remainder of the matrix
-        A[k + 1 : n, k + 1 : n] = A[k + 1 : n, k + 1 : n] - outer(
-            A[k + 1 : n, k], A[k, k + 1 : n]
-        )
-    # Separate result
-    L = tril(A, -1) + eye(n)
+        A[k + 1 : n, k] /= A[k, k]
+        # Update the remainder of the matrix in place
+        A[k + 1 : n, k + 1 : n] -= outer(A[k + 1 : n, k], A[k, k + 1 : n])
+    # Separate result: set the unit diagonal of L in place
+    L = tril(A, -1)
+    fill_diagonal(L, 1.0)
     U = triu(A)
     return L, U, p
 
@@ -195,13 +213,12 @@ def lu_no_pivoting(A):
         if A[k, k] == 0.0:
             raise ValueError("Error : zero pivot !")
         # Compute multipliers
-        A[k + 1 : n, k] = A[k + 1 : n, k] / A[k, k]
-        # Update the remainder of the matrix
-        A[k + 1 : n, k + 1 : n] = A[k + 1 : n, k + 1 : n] - outer(
-            A[k + 1 : n, k], A[k, k + 1 : n]
-        )
-    # Separate result
-    L = tril(A, -1) + eye(n)
+        A[k + 1 : n, k] /= A[k, k]
+        # Update the remainder of the matrix in place
+        A[k + 1 : n, k + 1 : n] -= outer(A[k + 1 : n, k], A[k, k + 1 : n])
+    # Separate result: set the unit diagonal of L in place
+    L = tril(A, -1)
+    fill_diagonal(L, 1.0)
     U = triu(A)
     return L, U
 
@@ -226,6 +243,12 @@ if __name__ == "__main__":
     print(u"x=")
     print(x)
     np.testing.assert_array_almost_equal(x, e)
+    # The right hand side is not modified
+    np.testing.assert_array_equal(b, U @ e)
+    # Several right hand sides
+    E = array([[1.0, -1.0], [2.0, 0.5], [3.0, 0.0], [4.0, 2.0]])
+    X = backward_substitution(U, U @ E)
+    np.testing.assert_array_almost_equal(X, E)
 
     # forward_elimination
     print(u"")
@@ -244,6 +267,12 @@ if __name__ == "__main__":
     print(u"x=")
     print(x)
     np.testing.assert_array_almost_equal(x, e)
+    # The right hand side is not modified
+    np.testing.assert_array_equal(b, L @ e)
+    # Several right hand sides
+    E = array([[1.0, -1.0], [2.0, 0.5], [3.0, 0.0], [4.0, 2.0]])
+    X = forward_elimination(L, L @ E)
+    np.testing.assert_array_almost_equal(X, E)
 
     # linalg
     print(u"")
@@ -338,6 +367,11 @@ if __name__ == "__main__":
     expected = array([-1.0, 1.0, 1.0])
     np.testing.assert_array_almost_equal(x, expected)
 
+    # Complex matrix: the row swaps keep the imaginary parts
+    A = array([[1.0, 2.0j, 0.0], [3.0 + 1.0j, 1.0, 2.0], [0.0, 1.0j, 4.0]])
+    L, U, p = lu_decomposition(A.copy())
+    np.testing.assert_array_almost_equal(L @ U, A[p])
+
     # Combine lu_no_pivoting, forward_elimination and backward_substitution
     A = array([[-2.0, 9.2, 3.8], [-0.6, 2.7, 2.4], [-1.0, 4.9, -4.9]])
     print(u"A=")
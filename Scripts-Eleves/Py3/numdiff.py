@@ -10,8 +10,36 @@ Dunod. Collection Sciences Sup. (2023)
 """
 
 import sys
+import math
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-import pylab as pl
+
+# The machine epsilon of floating point numbers
+_EPS = sys.float_info.epsilon
+
+
+@functools.lru_cache(maxsize=None)
+def _default_step(k):
+    """
+    Return the default step eps^(1/k) of a finite difference formula.
+
+    For a derivative of degree d computed with a formula of order p,
+    the approximately optimal step is eps^(1/(p + d)). The steps are
+    computed once for each exponent.
+
+    Parameters
+    ----------
+    k : int
+        The exponent of the step.
+
+    Returns
+    -------
+    h : float
+        The step.
+    """
+    h = _EPS ** (1.0 / k)
+    return h
 
 
 def first_derivative(f, x, h=None, p=2, *args):
@@ -97,9 +125,8 @@ def first_derivative(f, x, h=None, p=2, *args):
         g = (fxp - fxm) / h_exact
         return g, fcount
 
-    eps = sys.float_info.epsilon
-    if h == None:
-        h = eps ** (1.0 / (p + 1))
+    if h is None:
+        h = _default_step(p + 1)
     if p == 1:
         g, fcount = first_derivative_forward(f, x, h, *args)
     elif p == 2:
@@ -115,7 +142,43 @@ def first_derivative(f, x, h=None, p=2, *args):
     return g, fcount
 
 
-def gradient(f, x, h=None, p=2, *args):
+def _evaluate_points(f, X, vectorized, workers, *args):
+    """
+    Evaluates f on each column of X.
+
+    The threads only run concurrently while f releases the GIL,
+    e.g. in NumPy or in an external program. A pure Python f is
+    evaluated one column at a time, as without workers.
+
+    Parameters
+    ----------
+    f : function
+        The function.
+    X : array(n, k)
+        The points, one per column.
+    vectorized : bool
+        If True, f is evaluated once on the whole array X.
+    workers : int
+        The number of threads which evaluate f on the columns of X,
+        when f is not vectorized.
+    args : list
+        The optional arguments of f.
+
+    Returns
+    -------
+    Y : array
+        The values of f, one per column.
+        The last dimension of Y has size k.
+    """
+    if vectorized:
+        return f(X, *args)
+    columns = [X[:, j].copy() for j in range(X.shape[1])]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        values = list(executor.map(lambda x: f(x, *args), columns))
+    return np.array(values).T
+
+
+def gradient(f, x, h=None, p=2, *args, vectorized=False, workers=None):
     """
     Computes the gradient of a function f(x).
 
@@ -139,6 +202,15 @@ def gradient(f, x, h=None, p=2, *args):
 
         y=f(x,*args)
 
+    If vectorized is True, the function f is evaluated once on
+    all the perturbed points, stored in the columns of an array X
+    with shape (n, k). It must return the array of the k values
+    of the function, i.e. f(X)[j] = f(X[:, j]).
+    Otherwise, if workers is not None, the perturbed points are
+    evaluated concurrently by a pool of threads. This is useful
+    when f is expensive and releases the GIL, e.g. when it spends
+    its time in NumPy or in an external program.
+
     Uses the trick from (Dumontet, Vignes, 1977) to compute the
     step as accurately as possible: see. eq.14, p.16.
 
@@ -154,6 +226,11 @@ def gradient(f, x, h=None, p=2, *args):
         The order of the formula, p=1, 2 or 4.
     args : list
         The optional arguments of f.
+    vectorized : bool
+        If True, evaluate f once on all the perturbed points.
+    workers : int
+        The number of threads which evaluate f.
+        If None, f is evaluated sequentially.
 
     Returns
     -------
@@ -178,6 +255,8 @@ def gradient(f, x, h=None, p=2, *args):
     >>> h = 1.e-4
     >>> g, fcount = gradient(rosenbrockF, x, h)
     >>> g, fcount = gradient(rosenbrockF, x, p=4)
+    >>> g, fcount = gradient(rosenbrockF, x, vectorized=True)
+    >>> g, fcount = gradient(rosenbrockF, x, workers=2)
 
     References
     ----------
@@ -186,16 +265,29 @@ def gradient(f, x, h=None, p=2, *args):
     Analyse numérique 11.1 (1977), p. 13-25.
     """
 
+    def perturbed_points(x, h):
+        """Return the points x + h * e_i in the columns of an array."""
+        n = np.size(x)
+        X = np.repeat(x[:, np.newaxis], n, axis=1)
+        X[range(n), range(n)] += h
+        return X
+
     def gradient_forward(f, x, h, *args):
         """Apply forward_elimination finite difference for gradient."""
         n = np.size(x)
         fcount = n + 1
-        E = np.identity(n)
-        g = np.zeros(n)
         fx = f(x, *args)
+        if vectorized or workers is not None:
+            XP = perturbed_points(x, h)
+            h_exact = np.diag(XP) - x
+            fXP = _evaluate_points(f, XP, vectorized, workers, *args)
+            g = (fXP - fx) / h_exact
+            return g, fcount
+        g = np.zeros(n)
         for i in range(n):
-            v = h * E[:, i]
-            xp = x + v
+            # Only the i-th coordinate changes
+            xp = x.copy()
+            xp[i] = x[i] + h
             h_exact = xp[i] - x[i]
             fxp = f(xp, *args)
             g[i] = (fxp - fx) / h_exact
@@ -205,30 +297,62 @@ def gradient(f, x, h=None, p=2, *args):
         """Apply centered finite difference for gradient."""
         n = np.size(x)
         fcount = 2 * n
-        E = np.identity(n)
+        if vectorized or workers is not None:
+            XP = perturbed_points(x, h)
+            XM = perturbed_points(x, -h)
+            h_exact = np.diag(XP) - np.diag(XM)
+            fXP = _evaluate_points(f, XP, vectorized, workers, *args)
+            fXM = _evaluate_points(f, XM, vectorized, workers, *args)
+            g = (fXP - fXM) / h_exact
+            return g, fcount
         g = np.zeros(n)
         for i in range(n):
-            v = h * E[:, i]
-            xp = x + v
-            xm = x - v
+            # Only the i-th coordinate changes
+            xp = x.copy()
+            xp[i] = x[i] + h
+            xm = x.copy()
+            xm[i] = x[i] - h
             h_exact = xp[i] - xm[i]
             fxp = f(xp, *args)
             fxm = f(xm, *args)
             g[i] = (fxp - fxm) / h_exact
         return g, fcount
 
-    eps = sys.float_info.epsilon
-    if h == None:
-        h = eps ** (1.0 / (p + 1))
+    def gradient_richardson(f, x, h, *args):
+        """Apply Richardson extrapolation to centered finite differences."""
+        if vectorized or workers is not None:
+            g1, fcount1 = gradient_centered(f, x, h, *args)
+            g2, fcount2 = gradient_centered(f, x, 2.0 * h, *args)
+            fcount = fcount1 + fcount2
+            g = (4.0 * g1 - g2) / 3.0
+            return g, fcount
+        n = np.size(x)
+        fcount = 4 * n
+        g = np.zeros(n)
+        for i in range(n):
+            # Centered differences with steps h and 2h along the i-th axis
+            g_steps = []
+            for step in [h, 2.0 * h]:
+                xp = x.copy()
+                xp[i] = x[i] + step
+                xm = x.copy()
+                xm[i] = x[i] - step
+                h_exact = xp[i] - xm[i]
+                fxp = f(xp, *args)
+                fxm = f(xm, *args)
+                g_steps.append((fxp - fxm) / h_exact)
+            g[i] = (4.0 * g_steps[0] - g_steps[1]) / 3.0
+        return g, fcount
+
+    x = np.array(x, dtype=float, ndmin=1)
+    if h is None:
+        h = _default_step(p + 1)
     if p == 1:
         g, fcount = gradient_forward(f, x, h, *args)
     elif p == 2:
         g, fcount = gradient_centered(f, x, h, *args)
     elif p == 4:
-        g1, fcount1 = gradient_centered(f, x, h, *args)
-        g2, fcount2 = gradient_centered(f, x, 2.0 * h, *args)
-        fcount = fcount1 + fcount2
-        g = (4.0 * g1 - g2) / 3.0
+        g, fcount = gradient_richardson(f, x, h, *args)
     else:
         print(u"Error ! Unknown p=", p)
         return None
@@ -253,6 +377,8 @@ def _fonction_plot_x(x, f, *args):
     y : float
         The output of the function.
     """
+    import pylab as pl
+
     pl.plot(x[0], x[1], "bo")
     y = f(x, *args)
     return y
@@ -310,12 +436,13 @@ def gradient_gui(
     >>> g, fcount = gradient_gui(rosenbrockF, x, p=2)
     >>> g, fcount = gradient_gui(rosenbrockF, x, p=4)
     """
+    import pylab as pl
+
     if figure is None:
         figure = pl.figure()
     pl.title(u"Gradient d'ordre %d." % (p))
-    if h == None:
-        eps = sys.float_info.epsilon
-        h = eps ** (1.0 / (p + 1))
+    if h is None:
+        h = _default_step(p + 1)
     g, fcount = gradient(_fonction_plot_x, x, h, p, f, *args)
     pl.xlabel(u"$x_1$")
     pl.ylabel(u"$x_2$")
@@ -386,13 +513,14 @@ def second_derivative(f, x, h=None, p=2, *args):
         H = (g2 - g1) / h
         return H, fcount
 
-    def second_derivative_centered(f, x, h, *args):
+    def second_derivative_centered(f, x, h, fx, *args):
         """Apply centered finite difference for second derivative."""
-        fcount = 3
+        # f(x) is computed by the caller
+        fcount = 2
         xpp = x + 2.0 * h
         fpp = f(xpp, *args)
         xmp = x
-        fmp = f(x, *args)
+        fmp = fx
         xpm = x
         fpm = fmp
         xmm = x - 2.0 * h
@@ -404,17 +532,20 @@ def second_derivative(f, x, h=None, p=2, *args):
         H = (g2 - g1) / (2.0 * h)
         return H, fcount
 
-    if h == None:
-        eps = sys.float_info.epsilon
-        h = eps ** (1.0 / (p + 2))
+    if h is None:
+        h = _default_step(p + 2)
     if p == 1:
         H, fcount = second_derivative_forward(f, x, h, *args)
     elif p == 2:
-        H, fcount = second_derivative_centered(f, x, h, *args)
+        fx = f(x, *args)
+        H, fcount = second_derivative_centered(f, x, h, fx, *args)
+        fcount = fcount + 1
     elif p == 4:
-        H1, fcount1 = second_derivative_centered(f, x, h, *args)
-        H2, fcount2 = second_derivative_centered(f, x, 2.0 * h, *args)
-        fcount = fcount1 + fcount2
+        # f(x) is shared by the two steps
+        fx = f(x, *args)
+        H1, fcount1 = second_derivative_centered(f, x, h, fx, *args)
+        H2, fcount2 = second_derivative_centered(f, x, 2.0 * h, fx, *args)
+        fcount = fcount1 + fcount2 + 1
         H = (4.0 * H1 - H2) / 3.0
     else:
         print(u"Error ! Unknown p=", p)
@@ -422,7 +553,7 @@ def second_derivative(f, x, h=None, p=2, *args):
     return H, fcount
 
 
-def hessian(f, x, h=None, p=2, *args):
+def hessian(f, x, h=None, p=2, *args, vectorized=False, workers=None):
     """
     Computes the Hessian matrix of f(x)
 
@@ -430,6 +561,7 @@ def hessian(f, x, h=None, p=2, *args):
     y=f(x) is a float.
 
     Function f : same specifications as in gradient.
+    The vectorized and workers arguments are the same as in gradient.
 
     Parameters
     ----------
@@ -443,6 +575,11 @@ def hessian(f, x, h=None, p=2, *args):
         The order of the finite difference formula, p=1, 2 or 4
     args : list
         The optional arguments of f.
+    vectorized : bool
+        If True, evaluate f once on all the perturbed points.
+    workers : int
+        The number of threads which evaluate f.
+        If None, f is evaluated sequentially.
 
     Returns
     -------
@@ -467,64 +604,111 @@ def hessian(f, x, h=None, p=2, *args):
     >>> h = 1.e-4
     >>> g, fcount = hessian(rosenbrockF, x, h)
     >>> g, fcount = hessian(rosenbrockF, x, p=4)
+    >>> g, fcount = hessian(rosenbrockF, x, vectorized=True)
     """
 
+    def stencil_points(x, I, J, hi, hj):
+        """Return the points x + hi * e_I[k] + hj * e_J[k] in columns."""
+        k = np.arange(I.size)
+        X = np.repeat(x[:, np.newaxis], I.size, axis=1)
+        X[I, k] += hi
+        X[J, k] += hj
+        return X
+
     def hessian_forward(f, x, h, *args):
         """Apply forward_elimination finite difference for Hessian matrix."""
         n = np.size(x)
-        fcount = (n + 1) ** 2
-        E = np.identity(n)
+        fcount = 1 + n + n * (n + 1) // 2
+        if vectorized or workers is not None:
+            return hessian_forward_points(f, x, h, *args)
         H = np.zeros((n, n))
         fx = f(x, *args)
+        # The values f(x + h * e_i) are shared by the rows and the columns
+        fxi_all = []
+        for i in range(n):
+            xpi = x.copy()
+            xpi[i] += h
+            fxi_all.append(f(xpi, *args))
         for i in range(n):
-            vi = h * E[:, i]
-            xpi = x + vi
-            fxi = f(xpi, *args)
+            xpi = x.copy()
+            xpi[i] += h
+            fxi = fxi_all[i]
             for j in range(i + 1):
-                vj = h * E[:, j]
-                if j != i:
-                    xpj = x + vj
-                    fxj = f(xpj, *args)
-                else:
-                    xpj = x + vi
-                    fxj = fxi
-                xpij = x + vi + vj
+                fxj = fxi_all[j]
+                # Only the coordinates i and j change
+                xpij = xpi.copy()
+                xpij[j] += h
                 fxij = f(xpij, *args)
-                h_exact = xpj[j] - x[j]
+                h_exact = (x[j] + h) - x[j]
                 g1 = (fxj - fx) / h_exact
                 h_exact = xpij[j] - xpi[j]
                 g2 = (fxij - fxi) / h_exact
                 H[i, j] = (g2 - g1) / h
-        for i in range(n):
-            for j in range(i + 1, n):
-                H[i, j] = H[j, i]
+        # Copy the lower triangle into the upper triangle
+        upper = np.triu_indices(n, 1)
+        H[upper] = H.T[upper]
         return H, fcount
 
-    def hessian_centered(f, x, h, *args):
+    def hessian_forward_points(f, x, h, *args):
+        """Same as hessian_forward, evaluating all the points at once."""
+        n = np.size(x)
+        fx = f(x, *args)
+        # The entries (i, j) of the lower triangle
+        I, J = np.tril_indices(n)
+        m = I.size
+        # The points x + h * e_i, then x + h * e_i + h * e_j
+        XPI = np.repeat(x[:, np.newaxis], n, axis=1)
+        XPI[range(n), range(n)] += h
+        XPIJ = stencil_points(x, I, J, h, h)
+        X = np.hstack([XPI, XPIJ])
+        fX = _evaluate_points(f, X, vectorized, workers, *args)
+        fcount = 1 + X.shape[1]
+        fxi = fX[0:n]
+        fxij = fX[n:]
+        h_exact = (x[J] + h) - x[J]
+        g1 = (fxi[J] - fx) / h_exact
+        # The j-th coordinate of x + h * e_i is XPI[j, i]
+        h_exact = XPIJ[J, np.arange(m)] - XPI[J, I]
+        g2 = (fxij - fxi[I]) / h_exact
+        H = np.zeros((n, n))
+        H[I, J] = (g2 - g1) / h
+        H[J, I] = H[I, J]
+        return H, fcount
+
+    def hessian_centered(f, x, h, fx, *args):
         """Apply centered finite difference for Hessian matrix."""
         n = np.size(x)
+        if vectorized or workers is not None:
+            return hessian_centered_points(f, x, h, fx, *args)
+        # f(x) is computed by the caller
         fcount = 0
-        E = np.identity(n)
         H = np.zeros((n, n))
         for i in range(n):
-            vi = h * E[:, i]
             for j in range(i + 1):
-                vj = h * E[:, j]
-                xpp = x + vi + vj
+                # Only the coordinates i and j change
+                xpp = x.copy()
+                xpp[i] += h
+                xpp[j] += h
                 fpp = f(xpp, *args)
+                fcount += 1
                 if j != i:
-                    xmp = x - vi + vj
+                    xmp = x.copy()
+                    xmp[i] -= h
+                    xmp[j] += h
                     fmp = f(xmp, *args)
-                    xpm = x + vi - vj
+                    xpm = x.copy()
+                    xpm[i] += h
+                    xpm[j] -= h
                     fpm = f(xpm, *args)
                     fcount += 2
                 else:
                     xmp = x
-                    fmp = f(x, *args)
-                    fcount += 1
+                    fmp = fx
                     xpm = x
                     fpm = fmp
-                xmm = x - vi - vj
+                xmm = x.copy()
+                xmm[i] -= h
+                xmm[j] -= h
                 fmm = f(xmm, *args)
                 fcount += 1
                 h_exact = xpp[i] - xmp[i]
@@ -532,22 +716,63 @@ def hessian(f, x, h=None, p=2, *args):
                 h_exact = xpm[i] - xmm[i]
                 g1 = (fpm - fmm) / h_exact
                 H[i, j] = (g2 - g1) / (2 * h)
-        for i in range(n):
-            for j in range(i + 1, n):
-                H[i, j] = H[j, i]
+        # Copy the lower triangle into the upper triangle
+        upper = np.triu_indices(n, 1)
+        H[upper] = H.T[upper]
         return H, fcount
 
-    if h == None:
-        eps = sys.float_info.epsilon
-        h = eps ** (1.0 / (p + 2))
+    def hessian_centered_points(f, x, h, fx, *args):
+        """Same as hessian_centered, evaluating all the points at once."""
+        n = np.size(x)
+        # The entries (i, j) of the lower triangle, and those off the diagonal
+        I, J = np.tril_indices(n)
+        off = I != J
+        m = I.size
+        m_off = np.count_nonzero(off)
+        XPP = stencil_points(x, I, J, h, h)
+        XMM = stencil_points(x, I, J, -h, -h)
+        XMP = stencil_points(x, I[off], J[off], -h, h)
+        XPM = stencil_points(x, I[off], J[off], h, -h)
+        X = np.hstack([XPP, XMM, XMP, XPM])
+        fX = _evaluate_points(f, X, vectorized, workers, *args)
+        fcount = X.shape[1]
+        fpp = fX[0:m]
+        fmm = fX[m : 2 * m]
+        # On the diagonal, the points x + vi - vj and x - vi + vj are x
+        fmp = np.full(m, fx)
+        fmp[off] = fX[2 * m : 2 * m + m_off]
+        fpm = np.full(m, fx)
+        fpm[off] = fX[2 * m + m_off :]
+        # The i-th coordinates of the points
+        k = np.arange(m)
+        xmp_i = x[I]
+        xmp_i[off] = XMP[I[off], np.arange(m_off)]
+        xpm_i = x[I]
+        xpm_i[off] = XPM[I[off], np.arange(m_off)]
+        h_exact = XPP[I, k] - xmp_i
+        g2 = (fpp - fmp) / h_exact
+        h_exact = xpm_i - XMM[I, k]
+        g1 = (fpm - fmm) / h_exact
+        H = np.zeros((n, n))
+        H[I, J] = (g2 - g1) / (2 * h)
+        H[J, I] = H[I, J]
+        return H, fcount
+
+    x = np.array(x, dtype=float, ndmin=1)
+    if h is None:
+        h = _default_step(p + 2)
     if p == 1:
         H, fcount = hessian_forward(f, x, h, *args)
     elif p == 2:
-        H, fcount = hessian_centered(f, x, h, *args)
+        fx = f(x, *args)
+        H, fcount = hessian_centered(f, x, h, fx, *args)
+        fcount = fcount + 1
     elif p == 4:
-        H1, fcount1 = hessian_centered(f, x, h, *args)
-        H2, fcount2 = hessian_centered(f, x, 2.0 * h, *args)
-        fcount = fcount1 + fcount2
+        # f(x) is shared by the two steps
+        fx = f(x, *args)
+        H1, fcount1 = hessian_centered(f, x, h, fx, *args)
+        H2, fcount2 = hessian_centered(f, x, 2.0 * h, fx, *args)
+        fcount = fcount1 + fcount2 + 1
         H = (4.0 * H1 - H2) / 3.0
     else:
         print(u"Error ! Unknown p=", p)
@@ -600,11 +825,12 @@ def hessian_gui(f, x, h=None, p=2, limits_factor=6.0, *args):
     >>> g, fcount = hessian_gui(rosenbrockF, x, h)
     >>> g, fcount = hessian_gui(rosenbrockF, x, p=4)
     """
+    import pylab as pl
+
     pl.figure()
     pl.title(u"Hessienne d'ordre %d." % (p))
-    if h == None:
-        eps = sys.float_info.epsilon
-        h = eps ** (1.0 / (p + 2))
+    if h is None:
+        h = _default_step(p + 2)
     H, fcount = hessian(_fonction_plot_x, x, h, p, f, *args)
     # Enlarge the x and y limits
     pl.xlim(x[0] - limits_factor * h, x[0] + limits_factor * h)
@@ -640,14 +866,13 @@ def derivative_centered(f, x, d, h=None, *args):
 
     """
     if h is None:
-        eps = sys.float_info.epsilon
-        h = eps ** (1.0 / (2 + d))
+        h = _default_step(2 + d)
     y = np.zeros((d + 1))
     for i in range(d + 1):
         y[i] = f(x + i * 2.0 * h - d * h, *args)
+    # Divided differences: each level only depends on the previous one
     for k in range(d, 0, -1):
-        for i in range(k):
-            y[i] = (y[i + 1] - y[i]) / (2.0 * h)
+        y[0:k] = (y[1 : k + 1] - y[0:k]) / (2.0 * h)
     return y[0]
 
 
@@ -686,14 +911,13 @@ def derivative_forward(f, x, order, h=None, *args):
     >>> y = derivative_forward(np.sin, x, order)
     """
     if h is None:
-        eps = sys.float_info.epsilon
-        h = eps ** (1.0 / (1 + order))
+        h = _default_step(1 + order)
     y = np.zeros((order + 1))
     for i in range(order + 1):
         y[i] = f(x + i * h, *args)
+    # Divided differences: each level only depends on the previous one
     for k in range(order, 0, -1):
-        for i in range(k):
-            y[i] = (y[i + 1] - y[i]) / h
+        y[0:k] = (y[1 : k + 1] - y[0:k]) / h
     return y[0]
 
 
@@ -786,10 +1010,39 @@ def compute_coefficients(order, p, direction="centered"):
     >>> c = compute_coefficients(order, p, "backward")
     >>> c = compute_coefficients(order, p, "centered")
     """
+    # The cached array is shared: return a copy
+    c = _compute_coefficients(order, p, direction).copy()
+    return c
+
+
+@functools.lru_cache(maxsize=None)
+def _compute_coefficients(order, p, direction):
+    """
+    Computes the coefficients of the finite difference formula.
+
+    The coefficients only depend on the arguments, so that they
+    are cached: the linear system is solved once for each formula.
+    The returned array must not be modified.
+
+    Parameters
+    ----------
+    order : int
+        The order of the derivative.
+    p : int
+        The order of precision of the formula.
+    direction : str
+        The direction of the formula.
+
+    Returns
+    -------
+    c : np.array(order + p)
+        The coefficicients of the finite difference formula.
+    """
     # Compute matrix
     imin, imax = compute_indices(order, p, direction)
-    indices = list(range(imin, imax + 1))
-    A = np.vander(indices, increasing=True).T
+    indices = np.arange(imin, imax + 1)
+    # Row k contains the k-th powers of the indices
+    A = indices[np.newaxis, :] ** np.arange(order + p)[:, np.newaxis]
     # Compute right-hand side
     b = np.zeros((order + p))
     b[order] = 1.0
@@ -798,7 +1051,9 @@ def compute_coefficients(order, p, direction="centered"):
     return c
 
 
-def finite_differences(f, x, order, p, direction="centered", h=None, *args):
+def finite_differences(
+    f, x, order, p, direction="centered", h=None, *args, vectorized=False
+):
     """
     Computes the degree d derivative of f at point x.
 
@@ -808,6 +1063,10 @@ def finite_differences(f, x, order, p, direction="centered", h=None, *args):
     If direction is "centered", if d is even and if p is odd,
     then the order of precision is actually p + 1.
 
+    If vectorized is True, the function f is evaluated once on
+    the array of all the points of the formula, and must return
+    the array of the values.
+
     Parameters
     ----------
     f : function
@@ -826,6 +1085,8 @@ def finite_differences(f, x, order, p, direction="centered", h=None, *args):
         The step.
     *args : list
         The optional arguments of f.
+    vectorized : bool
+        If True, evaluate f once on all the points.
 
     Raises
     ------
@@ -845,33 +1106,35 @@ def finite_differences(f, x, order, p, direction="centered", h=None, *args):
     >>> p = 2  # Use order 2 precision
     >>> y = finite_differences(np.sin, x, order, p)
     >>> y = finite_differences(np.sin, x, order, p, "forward")
+    >>> y = finite_differences(np.sin, x, order, p, vectorized=True)
 
     """
     # Compute the optimal step size
     if h is None:
         if direction == "centered" and order % 2 == 0 and p % 2 == 1:
-            eps = sys.float_info.epsilon
-            h = eps ** (1.0 / (order + p + 1))
+            h = _default_step(order + p + 1)
         else:
-            eps = sys.float_info.epsilon
-            h = eps ** (1.0 / (order + p))
+            h = _default_step(order + p)
     # Compute the function values
     imin, imax = compute_indices(order, p, direction)
-    y = np.zeros((order + p))
-    for i in range(imin, imax + 1):
-        y[i - imin] = f(x + i * h, *args)
+    if vectorized:
+        y = f(x + np.arange(imin, imax + 1) * h, *args)
+    else:
+        y = np.fromiter(
+            (f(x + i * h, *args) for i in range(imin, imax + 1)),
+            dtype=float,
+            count=order + p,
+        )
     # Compute the coefficients
-    c = compute_coefficients(order, p, direction)
+    c = _compute_coefficients(order, p, direction)
     # Apply the formula
-    z = 0.0
-    for i in range(imin, imax + 1):
-        z += c[i - imin] * y[i - imin]
-    factor = np.math.factorial(order) / h ** order
+    z = np.sum(c * y)
+    factor = math.factorial(order) / h ** order
     z *= factor
     return z
 
 
-def jacobian(fun, x, h=None, p=2, *args):
+def jacobian(fun, x, h=None, p=2, *args, vectorized=False, workers=None):
     """
     Computes the Jacobian matrix of a vector function f(x)
 
@@ -895,6 +1158,13 @@ def jacobian(fun, x, h=None, p=2, *args):
 
         y=f(x,*args)
 
+    If vectorized is True, the function f is evaluated once on
+    all the perturbed points, stored in the columns of an array X
+    with shape (n, k). It must return the array with shape (m, k)
+    of the values of the function, i.e. f(X)[:, j] = f(X[:, j]).
+    Otherwise, if workers is not None, the perturbed points are
+    evaluated concurrently by a pool of threads, as in gradient.
+
     Parameters
     ----------
     f : function
@@ -907,6 +1177,11 @@ def jacobian(fun, x, h=None, p=2, *args):
         The order of precision of the formula, p=1, 2 or 4.
     args : list
         The optional arguments of f.
+    vectorized : bool
+        If True, evaluate f once on all the perturbed points.
+    workers : int
+        The number of threads which evaluate f.
+        If None, f is evaluated sequentially.
 
     Returns
     -------
@@ -926,36 +1201,80 @@ def jacobian(fun, x, h=None, p=2, *args):
     >>> J = jacobian(test_f, x)
     >>> J = jacobian(test_f, x, p=1)
     >>> J = jacobian(test_f, x, p=4)
+    >>> J = jacobian(test_f, x, vectorized=True)
     """
 
+    def perturbed_points(x, h):
+        """Return the points x + h[i] * e_i in the columns of an array."""
+        X = np.repeat(x[:, np.newaxis], x.size, axis=1)
+        X[range(x.size), range(x.size)] += h
+        return X
+
     def jacobian_forward(fun, x, h, *args):
+        y2 = fun(x, *args)
+        if vectorized or workers is not None:
+            XP = perturbed_points(x, h)
+            h_exact = np.diag(XP) - x
+            Y1 = _evaluate_points(fun, XP, vectorized, workers, *args)
+            J = (Y1 - y2[:, np.newaxis]) / h_exact
+            return J
         J = np.zeros((x.size, x.size))
         for i in range(x.size):
-            dx = np.zeros((x.size))
-            dx[i] = h[i]
-            xp = x + dx
+            # Only the i-th coordinate changes
+            xp = x.copy()
+            xp[i] = x[i] + h[i]
             h_exact = xp[i] - x[i]
             y1 = fun(xp, *args)
-            y2 = fun(x, *args)
             J[:, i] = (y1 - y2) / h_exact
         return J
 
     def jacobian_centered(fun, x, h, *args):
+        if vectorized or workers is not None:
+            XP = perturbed_points(x, h)
+            XM = perturbed_points(x, -h)
+            twice_h = np.diag(XP) - np.diag(XM)
+            Y1 = _evaluate_points(fun, XP, vectorized, workers, *args)
+            Y2 = _evaluate_points(fun, XM, vectorized, workers, *args)
+            J = (Y1 - Y2) / twice_h
+            return J
         J = np.zeros((x.size, x.size))
         for i in range(x.size):
-            dx = np.zeros((x.size))
-            dx[i] = h[i]
-            xp = x + dx
-            xm = x - dx
+            # Only the i-th coordinate changes
+            xp = x.copy()
+            xp[i] = x[i] + h[i]
+            xm = x.copy()
+            xm[i] = x[i] - h[i]
             twice_h = xp[i] - xm[i]
             y1 = fun(xp, *args)
             y2 = fun(xm, *args)
             J[:, i] = (y1 - y2) / twice_h
         return J
 
-    if h == None:
-        eps = sys.float_info.epsilon
-        h_scalar = eps ** (1.0 / (p + 1))
+    def jacobian_richardson(fun, x, h, *args):
+        if vectorized or workers is not None:
+            J1 = jacobian_centered(fun, x, h, *args)
+            J2 = jacobian_centered(fun, x, 2.0 * h, *args)
+            J = (4.0 * J1 - J2) / 3.0
+            return J
+        J = np.zeros((x.size, x.size))
+        for i in range(x.size):
+            # Centered differences with steps h and 2h along the i-th axis
+            J_steps = []
+            for factor in [1.0, 2.0]:
+                xp = x.copy()
+                xp[i] = x[i] + factor * h[i]
+                xm = x.copy()
+                xm[i] = x[i] - factor * h[i]
+                twice_h = xp[i] - xm[i]
+                y1 = fun(xp, *args)
+                y2 = fun(xm, *args)
+                J_steps.append((y1 - y2) / twice_h)
+            J[:, i] = (4.0 * J_steps[0] - J_steps[1]) / 3.0
+        return J
+
+    x = np.array(x, dtype=float, ndmin=1)
+    if h is None:
+        h_scalar = _default_step(p + 1)
         h = np.ones((x.size)) * h_scalar
     if p == 1:
         J = jacobian_forward(fun, x, h, *args)
@@ -963,9 +1282,7 @@ def jacobian(fun, x, h=None, p=2, *args):
         J = jacobian_centered(fun, x, h, *args)
     elif p == 4:
         # Richardson extrapolation
-        J1 = jacobian_centered(fun, x, h, *args)
-        J2 = jacobian_centered(fun, x, 2.0 * h, *args)
-        J = (4.0 * J1 - J2) / 3.0
+        J = jacobian_richardson(fun, x, h, *args)
     else:
         raise ValueError("Wrong value of p=", p)
     return J
@@ -974,6 +1291,7 @@ def jacobian(fun, x, h=None, p=2, *args):
 if __name__ == "__main__":
     runGraphics = True
     from numpy import sin, logspace, log10, cos
+    import pylab as pl
 
     def myfunc(x):
         y = sin(x)
@@ -1067,6 +1385,19 @@ if __name__ == "__main__":
     g, fcount = gradient(rosenbrockF, x, p=4)
     print(u"gradient (order 4)=", g)
     print(u"Function calls=", fcount)
+    # Gradient - all the perturbed points at once
+    for p in [1, 2, 4]:
+        g, fcount = gradient(rosenbrockF, x, p=p)
+        g_vec, fcount_vec = gradient(rosenbrockF, x, p=p, vectorized=True)
+        np.testing.assert_allclose(g_vec, g)
+        assert fcount_vec == fcount
+        g_threads, fcount_threads = gradient(rosenbrockF, x, p=p, workers=2)
+        np.testing.assert_allclose(g_threads, g)
+        assert fcount_threads == fcount
+    # Gradient - a scalar x is a vector of size 1
+    for p in [1, 2, 4]:
+        g, fcount = gradient(lambda x: np.sum(np.sin(x)), 1.0, p=p)
+        np.testing.assert_almost_equal(g, [np.cos(1.0)], decimal=4)
     # Hessian - order 2
     H, fcount = hessian(rosenbrockF, x, p=2)
     print(u"H (order 2)=", H)
@@ -1079,6 +1410,19 @@ if __name__ == "__main__":
     H, fcount = hessian(rosenbrockF, x, p=4)
     print(u"H (order 4)=", H)
     print(u"Function calls=", fcount)
+    # Hessian - all the perturbed points at once
+    for p in [1, 2, 4]:
+        H, fcount = hessian(rosenbrockF, x, p=p)
+        H_vec, fcount_vec = hessian(rosenbrockF, x, p=p, vectorized=True)
+        np.testing.assert_allclose(H_vec, H)
+        assert fcount_vec == fcount
+        H_threads, fcount_threads = hessian(rosenbrockF, x, p=p, workers=2)
+        np.testing.assert_allclose(H_threads, H)
+        assert fcount_threads == fcount
+    # Hessian - a scalar x is a vector of size 1
+    for p in [1, 2, 4]:
+        H, fcount = hessian(lambda x: np.sum(np.sin(x)), 1.0, p=p)
+        np.testing.assert_almost_equal(H, [[-np.sin(1.0)]], decimal=4)
 
     #
     # Dessine le stencil du gradient
@@ -1121,6 +1465,15 @@ if __name__ == "__main__":
         for direction in ["forward", "backward"]:
             y = finite_differences(np.sin, x, order, p, direction=direction)
             np.testing.assert_almost_equal(y, exact, decimal=6)
+            y_vec = finite_differences(
+                np.sin, x, order, p, direction=direction, vectorized=True
+            )
+            np.testing.assert_allclose(y_vec, y)
+    # The coefficients are cached, but each call returns a new array
+    c = compute_coefficients(order, 4, "forward")
+    c[:] = 0.0
+    assert np.all(compute_coefficients(order, 4, "forward") != 0.0)
+    assert _compute_coefficients.cache_info().hits > 0
     # Check Jacobian
     def test_f(x):
         A = np.array([[1.0, 2.0], [3.0, 4.0]])
@@ -1134,6 +1487,21 @@ if __name__ == "__main__":
         print(u"order=", p, "J=")
         print(J)
         np.testing.assert_almost_equal(J, J_exact, decimal=6)
+    # The step can be an array
+    h = np.array([1.0e-6, 2.0e-6])
+    J = jacobian(test_f, x, h)
+    np.testing.assert_almost_equal(J, J_exact, decimal=6)
+    # Jacobian - all the perturbed points at once
+    for p in [1, 2, 4]:
+        J = jacobian(test_f, x, p=p)
+        J_vec = jacobian(test_f, x, p=p, vectorized=True)
+        np.testing.assert_allclose(J_vec, J)
+        J_threads = jacobian(test_f, x, p=p, workers=2)
+        np.testing.assert_allclose(J_threads, J)
+    # Jacobian - a scalar x is a vector of size 1
+    for p in [1, 2, 4]:
+        J = jacobian(np.sin, np.array(1.0), p=p)
+        np.testing.assert_almost_equal(J, [[np.cos(1.0)]], decimal=4)
 
     def mysquare(x):
         y = x ** 2
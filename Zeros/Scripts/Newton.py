@@ -201,7 +201,7 @@ pl.ylabel(u"$f(x)$")
 pl.title(u"Newton Counter Example - C")
 x1 = 1.01
 xs, history = newtongui(counterPow3F, x1, counterPow3FPrime)
-print("history", history)
+print("history", history.tolist())
 print("Number of iterations:", len(history))
 
 #